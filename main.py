@@ -1,12 +1,10 @@
-from pathlib import Path
+import sys
 from src import MainGUI
 
 
+# python main.py [box], 4 for 16 x 16 and so on (3, the usual 9 x 9, by default)
 def main():
-    if not Path('./database.json').exists():
-        with open('database.json', 'w') as f:
-            f.write('{}')
-    gui = MainGUI()
+    gui = MainGUI(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
     gui.mainloop()
 
 
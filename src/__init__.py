@@ -1,8 +1,32 @@
 import json
-import tkinter as tk
+from importlib import import_module
 from src.board import Board
-from src.frame_action import ActionFrame
-from src.frame_board import BoardFrame
-from src.frame_config import ConfigFrame
-from src.frame_pattern import PatternFrame
-from src.windows import SaveWindow, ImportWindow, ExportWindow, RenameWindow, DeleteWindow, RandomWindow
+
+# the GUI is only imported when something asks for it, so the command line never has to load tkinter
+_lazy_modules = {
+    'tk': 'tkinter',
+    'MainGUI': 'src.gui',
+    'ActionFrame': 'src.frame_action',
+    'BoardFrame': 'src.frame_board',
+    'ConfigFrame': 'src.frame_config',
+    'PatternFrame': 'src.frame_pattern',
+    'PatternStore': 'src.storage',
+    'SolutionCache': 'src.cache',
+    'History': 'src.history',
+    'Candidates': 'src.hints',
+    'SaveWindow': 'src.windows',
+    'ImportWindow': 'src.windows',
+    'ExportWindow': 'src.windows',
+    'RenameWindow': 'src.windows',
+    'DeleteWindow': 'src.windows',
+    'RandomWindow': 'src.windows',
+}
+
+
+def __getattr__(name: str):
+    if name not in _lazy_modules:
+        raise AttributeError(f'module \'src\' has no attribute \'{name}\'')
+    module = import_module(_lazy_modules[name])
+    value = module if name == 'tk' else getattr(module, name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,236 @@
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+from time import perf_counter
+from src.board import Board, ENGINES, BOX_SIZES
+from src.stats import SolveStats
+
+'''
+Headless entry point, only board.py gets imported (no tkinter, no display needed):
+    python -m src solve <81 digits> [-e engine] [-v] [-s stats.json] [-b box]
+    python -m src generate [-p percent] [-n count] [-b box]
+    python -m src batch <file or -> [-o output] [-j processes] [--vectorized]
+    python -m src rate [81 digits] [-d database.sqlite]
+    python -m src import <file> [-f lines|sdm] [-d database.sqlite] [-j processes]
+    python -m src export <file or -> [-f lines|sdm] [-d database.sqlite] [--dots]
+    python -m src bench [-m modes] [-c corpora] [-o results.json] [--save-baseline] [--startup] [--micro]
+    python -m src serve [--host 127.0.0.1] [-p port] [-j processes] [-w window_ms] [--max-batch n]
+
+COLD START (python -m src solve, 'wikipedia anti bf', DLX): ~ 0.08s
+'''
+
+COLD_START_BUDGET = 0.25  # seconds, checked by bench --startup
+WIKIPEDIA_ANTI_BF = '000000000000003085001020000000507000004000100090000000500000073002010000000040009'
+
+
+def cmd_solve(args) -> int:
+    board = Board(args.box)
+    board.set_engine(args.engine)
+    if args.verbose or args.stats:
+        board.stats = SolveStats()
+    if not board.import_(args.puzzle):
+        print('Invalid input!', file=sys.stderr)
+        return 2
+    count, dt = board.solve()
+    if args.stats:
+        board.stats.save(args.stats)
+    if count is None:
+        print('No solution.', file=sys.stderr)
+        return 1
+    print(board.export())
+    if args.verbose:
+        print(f'Solved in {count} iteration(s) and {dt:.3f}s', file=sys.stderr)
+        print(board.stats.summary(), file=sys.stderr)
+    return 0
+
+
+def cmd_generate(args) -> int:
+    board = Board(args.box)
+    for _ in range(args.count):
+        board.generate_random(args.percent)
+        print(board.export())
+    return 0
+
+
+def cmd_batch(args) -> int:
+    from src.batch import solve_file, report
+
+    if args.vectorized:
+        stats = solve_file(args.input, args.output, vectorized=True, chunksize=args.chunksize or 4096)
+    else:
+        stats = solve_file(
+            args.input, args.output, processes=args.processes, chunksize=args.chunksize or 64, engine=args.engine
+        )
+    print(report(stats), file=sys.stderr)
+    return 0 if not stats['failed'] else 1
+
+
+def cmd_rate(args) -> int:
+    from src import rater
+
+    if args.puzzle is not None:
+        board = Board()
+        if not board.import_(args.puzzle):  # the rater takes 81 plain digits only
+            print('Invalid input!', file=sys.stderr)
+            return 2
+        score, technique = rater.rate(board.export())
+        print(f'{score:.1f} {technique}')
+        return 0 if technique != 'invalid' else 1
+
+    from src.storage import PatternStore
+
+    store = PatternStore(args.database)
+    time_start = perf_counter()
+    count = rater.rate_library(store, processes=args.processes)
+    print(f'Rated {count} pattern(s) in {perf_counter() - time_start:.3f}s, {len(store) - count} cached or not 9 x 9')
+    return 0
+
+
+def cmd_import(args) -> int:
+    from src import bulk
+    from src.storage import PatternStore
+
+    stats = bulk.import_file(PatternStore(args.database), args.input, args.format, processes=args.processes)
+    print(bulk.report(stats), file=sys.stderr)
+    return 0 if not stats['failed'] else 1
+
+
+def cmd_export(args) -> int:
+    from src import bulk
+    from src.storage import PatternStore
+
+    store = PatternStore(args.database)
+    if args.output == '-':
+        count = bulk.export_stream(store, sys.stdout, args.format or 'lines', args.dots)
+    else:
+        count = bulk.export_file(store, args.output, args.format, args.dots)
+    print(f'Exported {count} pattern(s)', file=sys.stderr)
+    return 0
+
+
+def cmd_bench(args) -> int:
+    if args.startup:
+        return bench_startup(args.runs)
+
+    from src import bench
+
+    if args.micro:
+        bench.micro(args.runs, log=print)
+        return 0
+
+    baseline = args.baseline or bench.BASELINE_PATH
+    results = bench.run(args.modes or bench.MODES, args.corpora, args.timeout, log=print)
+    bench.save(results, args.output)
+    if args.save_baseline:
+        bench.save(results, baseline)
+        print(f'Saved the baseline to {baseline}')
+        return 0
+    if not Path(baseline).exists():
+        print(f'No baseline at {baseline}, run with --save-baseline first')
+        return 0
+
+    lines, regressed = bench.compare(results, bench.load(baseline))
+    print('Compared with the baseline:' if lines else 'Same as the baseline.')
+    for line in lines:
+        print(line)
+    return 1 if regressed else 0
+
+
+def cmd_serve(args) -> int:
+    from src.server import serve
+
+    return serve(
+        args.host, args.port, processes=args.processes, window=args.window / 1000, max_batch=args.max_batch,
+        verbose=args.verbose
+    )
+
+
+def bench_startup(runs: int) -> int:
+    import subprocess
+
+    command = [sys.executable, '-m', 'src', 'solve', WIKIPEDIA_ANTI_BF, '-e', 'dlx']
+    times = []
+    for _ in range(runs):
+        time_start = perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        times.append(perf_counter() - time_start)
+
+    average = sum(times) / runs
+    print(f'cold start: best {min(times):.3f}s, average {average:.3f}s, budget {COLD_START_BUDGET:.3f}s')
+    return 0 if average <= COLD_START_BUDGET else 1
+
+
+def main(argv: list[str] = None) -> int:
+    parser = ArgumentParser(prog='python -m src', description='Sudoku solver without the GUI.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    solve = commands.add_parser('solve', help='solve one 81-digit puzzle (0 for empty cells)')
+    solve.add_argument('puzzle')
+    solve.add_argument('-e', '--engine', default='dlx', choices=ENGINES)
+    solve.add_argument('-v', '--verbose', action='store_true', help='print iterations, time and stats to stderr')
+    solve.add_argument('-s', '--stats', default=None, help='write the solver stats to this JSON file')
+    solve.add_argument('-b', '--box', type=int, default=3, choices=BOX_SIZES, help='4 for 16 x 16 and so on')
+    solve.set_defaults(func=cmd_solve)
+
+    generate = commands.add_parser('generate', help='print puzzles with a unique solution')
+    generate.add_argument('-p', '--percent', type=int, default=35, help='percent of cells filled (default 35)')
+    generate.add_argument('-n', '--count', type=int, default=1)
+    generate.add_argument('-b', '--box', type=int, default=3, choices=BOX_SIZES, help='4 for 16 x 16 and so on')
+    generate.set_defaults(func=cmd_generate)
+
+    batch = commands.add_parser('batch', help='solve a file of puzzles, one per line, on several processes')
+    batch.add_argument('input', help='puzzle file, - for stdin')
+    batch.add_argument('-o', '--output', default='-', help='solution file, - for stdout')
+    batch.add_argument('-j', '--processes', type=int, default=None)
+    batch.add_argument('-c', '--chunksize', type=int, default=None, help='default 64, 4096 with --vectorized')
+    batch.add_argument('-e', '--engine', default='dlx', choices=ENGINES)
+    batch.add_argument('-v', '--vectorized', action='store_true', help='solve chunks at once with numpy, one process')
+    batch.set_defaults(func=cmd_batch)
+
+    rate = commands.add_parser('rate', help='rate one puzzle, or every unrated pattern in the library')
+    rate.add_argument('puzzle', nargs='?', default=None)
+    rate.add_argument('-d', '--database', default='database.sqlite')
+    rate.add_argument('-j', '--processes', type=int, default=None)
+    rate.set_defaults(func=cmd_rate)
+
+    import_ = commands.add_parser('import', help='add every puzzle in a file to the pattern library')
+    import_.add_argument('input')
+    import_.add_argument('-f', '--format', default=None, choices=('lines', 'sdm'), help='default from the extension')
+    import_.add_argument('-d', '--database', default='database.sqlite')
+    import_.add_argument('-j', '--processes', type=int, default=None)
+    import_.set_defaults(func=cmd_import)
+
+    export = commands.add_parser('export', help='write the pattern library to a file')
+    export.add_argument('output', help='file, - for stdout')
+    export.add_argument('-f', '--format', default=None, choices=('lines', 'sdm'), help='default from the extension')
+    export.add_argument('-d', '--database', default='database.sqlite')
+    export.add_argument('--dots', action='store_true', help='write . for empty cells')
+    export.set_defaults(func=cmd_export)
+
+    bench = commands.add_parser('bench', help='run every solver mode over the benchmark corpora')
+    bench.add_argument('-m', '--modes', nargs='+', default=None, help='engine or engine+lcv (default every mode)')
+    bench.add_argument('-c', '--corpora', nargs='+', default=None, help='easy, hard, 17-clue, anti-bf (default all)')
+    bench.add_argument('-t', '--timeout', type=float, default=10.0, help='seconds per puzzle (default 10)')
+    bench.add_argument('-o', '--output', default='bench_results.json')
+    bench.add_argument('--baseline', default=None, help='default src/_bench_baseline.json')
+    bench.add_argument('--save-baseline', action='store_true', help='store these results as the new baseline')
+    bench.add_argument('--startup', action='store_true', help='measure cold start against COLD_START_BUDGET')
+    bench.add_argument('--micro', action='store_true', help='time the plain loop and its bit tricks alone')
+    bench.add_argument('--runs', type=int, default=5)
+    bench.set_defaults(func=cmd_bench)
+
+    serve = commands.add_parser('serve', help='solve, validate, count and generate over HTTP')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('-p', '--port', type=int, default=8081, help='0 picks a free port')
+    serve.add_argument('-j', '--processes', type=int, default=None)
+    serve.add_argument('-w', '--window', type=float, default=5.0, help='milliseconds to collect a batch (default 5)')
+    serve.add_argument('--max-batch', type=int, default=256)
+    serve.add_argument('-v', '--verbose', action='store_true', help='log every request to stderr')
+    serve.set_defaults(func=cmd_serve)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
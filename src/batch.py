@@ -0,0 +1,95 @@
+import sys
+from multiprocessing import Pool
+from itertools import islice
+from time import perf_counter
+from src.board import Board
+
+_board = None
+
+
+def _init_worker(engine: str):
+    global _board
+    _board = Board()
+    _board.set_engine(engine)
+
+
+# one puzzle in, one output line back, a bad line only ever costs its own line
+def _solve_line(line: str) -> tuple[bool, str]:
+    line = line.strip()
+    try:
+        if not _board.import_(line):
+            return (False, 'error: invalid puzzle')
+        count, _ = _board.solve()
+        if count is None:
+            return (False, 'error: no solution')
+        return (True, _board.export())
+    except Exception as e:
+        return (False, f'error: {type(e).__name__}')
+
+
+def solve_stream(lines, out, processes: int = None, chunksize: int = 64, engine: str = 'dlx') -> dict:
+    time_start = perf_counter()
+    stats = {'puzzles': 0, 'solved': 0, 'failed': 0}
+
+    with Pool(processes, initializer=_init_worker, initargs=(engine,)) as pool:
+        # imap keeps the input order and only pulls as many lines as the workers need
+        for ok, result in pool.imap(_solve_line, (line for line in lines if line.strip()), chunksize):
+            out.write(result + '\n')
+            stats['puzzles'] += 1
+            stats['solved' if ok else 'failed'] += 1
+
+    stats['seconds'] = perf_counter() - time_start
+    stats['puzzles_per_s'] = stats['puzzles'] / stats['seconds']
+    return stats
+
+
+# same output as solve_stream, but chunksize puzzles at a time go through the numpy solver in this process
+def solve_stream_vectorized(lines, out, chunksize: int = 4096) -> dict:
+    from src import vectorized
+
+    time_start = perf_counter()
+    stats = {'puzzles': 0, 'solved': 0, 'failed': 0, 'fallbacks': 0}
+    board = Board()
+    lines = (line.strip().replace('.', '0') for line in lines if line.strip())
+
+    while chunk := list(islice(lines, chunksize)):
+        results = ['error: invalid puzzle'] * len(chunk)
+        valid = [k for k, line in enumerate(chunk) if len(line) == 81 and line.isascii() and line.isdigit()]
+        if valid:
+            cand = vectorized.to_candidates([chunk[k] for k in valid])
+            conflicting = vectorized.conflicting(cand)
+            valid = [k for k, bad in zip(valid, conflicting.tolist()) if not bad]
+            solutions, fallbacks = vectorized.solve_many([chunk[k] for k in valid], board)
+            stats['fallbacks'] += fallbacks
+            for k, solution in zip(valid, solutions):
+                results[k] = solution or 'error: no solution'
+
+        for result in results:
+            out.write(result + '\n')
+            stats['failed' if result.startswith('error') else 'solved'] += 1
+        stats['puzzles'] += len(chunk)
+
+    stats['seconds'] = perf_counter() - time_start
+    stats['puzzles_per_s'] = stats['puzzles'] / stats['seconds']
+    return stats
+
+
+def solve_file(path_in: str, path_out: str = '-', vectorized: bool = False, **kwargs) -> dict:
+    f_in = sys.stdin if path_in == '-' else open(path_in, 'r')
+    f_out = sys.stdout if path_out == '-' else open(path_out, 'w')
+    try:
+        return (solve_stream_vectorized if vectorized else solve_stream)(f_in, f_out, **kwargs)
+    finally:
+        if f_in is not sys.stdin:
+            f_in.close()
+        if f_out is not sys.stdout:
+            f_out.close()
+
+
+def report(stats: dict) -> str:
+    return (
+        f'{stats["puzzles"]} puzzle(s), {stats["solved"]} solved, {stats["failed"]} failed '
+        f'in {stats["seconds"]:.3f}s ({stats["puzzles_per_s"]:.1f} puzzles/s)'
+        + (f', {stats["fallbacks"]} needed the scalar solver' if 'fallbacks' in stats else '')
+    )
+
@@ -0,0 +1,174 @@
+import json
+import platform
+from multiprocessing import Pool, TimeoutError
+from pathlib import Path
+from time import perf_counter
+from src.board import Board, bit_tables
+
+'''
+Every solver mode over the fixed corpora in _corpora.json (easy, hard, 17-clue, anti-bf).
+Each solve runs in a worker process so a mode that takes forever (plain on anti-bf) only costs the timeout.
+Every run keeps its per-puzzle results and is compared with _bench_baseline.json over the puzzles both solved,
+so a tree that finishes more puzzles isn't charged for their time. A puzzle the baseline solved and this run
+didn't is a regression, iterations are deterministic so any change is reported, time only counts as a regression
+above TIME_TOLERANCE (and MIN_SECONDS).
+micro() times the plain loop alone (and the bit tricks it's made of) against MICRO_REFERENCE.
+'''
+
+CORPORA_PATH = Path(__file__).with_name('_corpora.json')
+BASELINE_PATH = Path(__file__).with_name('_bench_baseline.json')
+MODES = ('plain', 'mrv', 'mrv+lcv', 'dynamic_mrv', 'dynamic_mrv+lcv', 'propagation', 'propagation+lcv', 'dlx')
+TIME_TOLERANCE = 1.25
+MIN_SECONDS = 0.05  # totals below this are mostly timer noise
+MICRO_REFERENCE = 714_000  # plain loop iterations/s back when is_cell_valid scanned the cells (see board.py)
+MICRO_PUZZLE = '020000300000000010000400009203048090600000800890000000300007902702000401000000000'  # 5.7M iterations
+
+
+def load_corpora() -> dict[str, list[str]]:
+    with open(CORPORA_PATH, 'r') as f:
+        return json.load(f)
+
+
+def _run(mode: str, puzzle: str) -> tuple[int, float]:
+    engine, _, lcv = mode.partition('+')
+    board = Board()
+    board.set_engine(engine)
+    board.set_use_LCV(lcv == 'lcv')
+    board.import_(puzzle)
+    return board.solve()
+
+
+def run(modes: tuple[str] = MODES, corpora: list[str] = None, timeout: float = 10.0, log: callable = None) -> dict:
+    all_corpora = load_corpora()
+    corpora = corpora or list(all_corpora)
+    results = {'python': platform.python_version(), 'machine': platform.machine(), 'timeout': timeout, 'runs': []}
+    pool = Pool(1)
+
+    try:
+        for corpus in corpora:
+            for mode in modes:
+                record = {'corpus': corpus, 'mode': mode, 'iterations': 0, 'seconds': 0.0, 'solved': 0, 'timeouts': 0}
+                puzzles = {}  # puzzle: [iterations, seconds], None when it wasn't solved
+                for puzzle in all_corpora[corpus]:
+                    puzzles[puzzle] = None
+                    try:
+                        count, dt = pool.apply_async(_run, (mode, puzzle)).get(timeout)
+                    except TimeoutError:  # the only way to stop a running solve is to kill its process
+                        pool.terminate()
+                        pool = Pool(1)
+                        record['timeouts'] += 1
+                        continue
+                    if count is not None:
+                        puzzles[puzzle] = [count, dt]
+                        record['iterations'] += count
+                        record['seconds'] += dt
+                        record['solved'] += 1
+                record['puzzles'] = puzzles
+                record['iterations_per_s'] = record['iterations'] / record['seconds'] if record['seconds'] else 0.0
+                results['runs'].append(record)
+                if log is not None:
+                    log(format_run(record))
+    finally:
+        pool.terminate()
+
+    return results
+
+
+def format_run(run: dict) -> str:
+    timeouts = f' ({run["timeouts"]} timeout(s))' if run['timeouts'] else ''
+    return (
+        f'{run["corpus"]:<8} {run["mode"]:<16} {run["iterations"]:>12} iteration(s) '
+        f'{run["seconds"]:>9.4f}s {run["iterations_per_s"]:>12.1f} iterations/s{timeouts}'
+    )
+
+
+# ns per lowest-bit / bit-count over every 9 x 9 mask, the old string tricks next to the lookup tables
+def _bit_ops(runs: int) -> dict[str, float]:
+    popcount, ctz = bit_tables(9)
+    masks = list(range(1, 1 << 10))
+    ops = {
+        'ctz_bin': lambda: [bin(m)[::-1].index('1') for m in masks],
+        'ctz_table': lambda: [ctz[m] for m in masks],
+        'popcount_bin': lambda: [bin(m).count('1') for m in masks],
+        'popcount_table': lambda: [popcount[m] for m in masks],
+    }
+    results = {}
+    for name, op in ops.items():
+        best = float('inf')
+        for _ in range(runs):
+            time_start = perf_counter()
+            for _ in range(100):
+                op()
+            best = min(best, perf_counter() - time_start)
+        results[name] = 1e9 * best / (100 * len(masks))
+    return results
+
+
+def micro(runs: int = 3, log: callable = None) -> dict:
+    results = {'python': platform.python_version(), 'machine': platform.machine(), 'ns_per_op': _bit_ops(runs)}
+    board = Board()
+    best = 0.0
+    for _ in range(runs):
+        board.import_(MICRO_PUZZLE)
+        count, dt = board.solve()
+        best = max(best, count / dt)
+    results['iterations'] = count
+    results['iterations_per_s'] = best
+    results['vs_reference'] = best / MICRO_REFERENCE
+
+    if log is not None:
+        for name, ns in results['ns_per_op'].items():
+            log(f'{name:<16} {ns:>8.1f} ns/op')
+        log(f'plain loop       {best:>12.1f} iterations/s, {results["vs_reference"]:.2f}x of {MICRO_REFERENCE}')
+    return results
+
+
+# returns the lines worth reading, regressions are marked with '!'
+def compare(results: dict, baseline: dict) -> tuple[list[str], bool]:
+    old_runs = {(r['corpus'], r['mode']): r for r in baseline['runs']}
+    lines = []
+    regressed = False
+
+    for run in results['runs']:
+        old = old_runs.get((run['corpus'], run['mode']))
+        name = f'{run["corpus"]:<8} {run["mode"]:<16}'
+        if old is None:
+            lines.append(f'  {name} new, no baseline')
+            continue
+        if 'puzzles' not in old:
+            lines.append(f'  {name} the baseline has no per-puzzle results, run with --save-baseline')
+            continue
+
+        new_puzzles, old_puzzles = run['puzzles'], old['puzzles']
+        lost = sum(1 for p, r in old_puzzles.items() if r is not None and new_puzzles.get(p) is None)
+        gained = sum(1 for p, r in new_puzzles.items() if r is not None and old_puzzles.get(p) is None)
+        if lost:
+            regressed = True
+            lines.append(f'! {name} {lost} puzzle(s) the baseline solved aren\'t solved ({run["timeouts"]} timeout(s))')
+        if gained:
+            lines.append(f'  {name} {gained} puzzle(s) solved that the baseline didn\'t')
+
+        both = [(old_puzzles[p], r) for p, r in new_puzzles.items() if r is not None and old_puzzles.get(p) is not None]
+        old_iterations, new_iterations = sum(o[0] for o, _ in both), sum(n[0] for _, n in both)
+        old_seconds, new_seconds = sum(o[1] for o, _ in both), sum(n[1] for _, n in both)
+        if new_iterations != old_iterations:
+            lines.append(f'  {name} iterations {old_iterations} -> {new_iterations}')
+        if max(old_seconds, new_seconds) < MIN_SECONDS:
+            continue
+        if new_seconds > old_seconds * TIME_TOLERANCE:
+            regressed = True
+            lines.append(f'! {name} {old_seconds:.4f}s -> {new_seconds:.4f}s over {len(both)} puzzle(s)')
+        elif new_seconds < old_seconds / TIME_TOLERANCE:
+            lines.append(f'  {name} {old_seconds:.4f}s -> {new_seconds:.4f}s over {len(both)} puzzle(s)')
+
+    return (lines, regressed)
+
+
+def save(results: dict, path: str):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=4)
+
+
+def load(path: str) -> dict:
+    with open(path, 'r') as f:
+        return json.load(f)
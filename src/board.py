@@ -1,5 +1,7 @@
 import random
+from functools import lru_cache
 from time import perf_counter
+from src.stats import SolveStats
 
 '''
 BENCHMARK BOARD: 'very very hard'
@@ -9,171 +11,906 @@ BENCHMARK BOARD: 'very very hard'
 BENCHMARK BOARD: 'wikipedia anti bf'
     Previous solver: ~ 800s
     BLAZINGLY FAST solver: ~ 65s
-    MRV solver:
+    MRV solver: 832k iterations, ~ 0.9s
+    Dynamic MRV solver: 5.5k iterations, ~ 0.02s
+    Propagation solver: 0 branches (64 cells resolved by singles), ~ 0.002s
+    DLX solver: 65 iterations, ~ 0.001s (+ ~ 0.02s to build the matrix once)
+
+BENCHMARK BOARD: the one in __main__
+    BLAZINGLY FAST solver: 5.7M iterations, ~ 4.2s
+    MRV solver: 2.7k iterations, ~ 0.002s
+    Propagation solver: 17 branches (42 cells resolved by singles), ~ 0.006s
+
+LCV (iterations without -> with LCV):
+    'wikipedia anti bf'  MRV: 833k -> 1.7M, dynamic MRV: 5.5k -> 2.1k
+    the one in __main__  MRV: 2.7k -> 1.6M, dynamic MRV: 406 -> 60, propagation: 17 -> 22
+    'arto inkala'        MRV: 62M -> 13.6M, dynamic MRV: 19k -> 6.6k, propagation: 89 -> 79
+    with the static MRV order LCV usually hurts, with dynamic MRV it cuts iterations 2-7x
+
+DLX: 'arto inkala' 1.5k iterations, ~ 0.016s
+    same solution as every other mode on boards with a unique solution, boards with several solutions
+    can end up on a different one (just like MRV already does)
+
+OCCUPANCY BITMASKS (used / holder, kept up to date by __setitem__ instead of scanning the cells):
+    import_: 3.8k -> 23.8k boards/s, generate_random(100): 517 -> 1.9k boards/s
+    generate_random with clue removal barely changes, the uniqueness checks are most of its time
+
+LOOKUP TABLES (popcount / ctz instead of bin() strings, cell_units instead of three c_* lookups, locals in the loops):
+    plain loop on the one in __main__: 2.0M -> 3.1M iterations/s (python -m src bench --micro, 714k back in the scanning
+    days), MRV 2.0M -> 3.0M, dynamic MRV and propagation ~ 10% faster, iteration counts unchanged
 '''
 
+ENGINES = ('plain', 'mrv', 'dynamic_mrv', 'propagation', 'dlx')
+
+
+# exact cover with 4 * N^2 constraints (cell, row-digit, column-digit, box-digit) x N^3 candidates (cell, digit),
+# 324 x 729 for the usual 9 x 9 (box 3)
+# the links are plain int lists instead of node objects, node 0 is the root and nodes 1 - 4 * N^2 are the column headers
+class DancingLinks():
+    def __init__(self, box: int = 3):
+        self.size = size = box * box
+        cells = size * size
+        headers = 4 * cells
+        self.L, self.R = list(range(-1, headers)), list(range(1, headers + 2))
+        self.L[0], self.R[headers] = headers, 0
+        self.U, self.D, self.C = list(range(headers + 1)), list(range(headers + 1)), list(range(headers + 1))
+        self.S = [0] * (headers + 1)
+        self.candidate = [None] * (headers + 1)  # (cell, digit) of every row node
+        self.first = [0] * (cells * size)  # first node of every candidate row
+
+        for cell in range(cells):
+            r, c, b = cell // size, cell % size, cell // (size * box) * box + cell % size // box
+            for n in range(1, size + 1):
+                columns = (
+                    1 + cell, 1 + cells + r * size + n - 1, 1 + 2 * cells + c * size + n - 1,
+                    1 + 3 * cells + b * size + n - 1
+                )
+                start = len(self.C)
+                self.first[cell * size + n - 1] = start
+                for offset, col in enumerate(columns):
+                    node = start + offset
+                    self.L.append(start + (offset - 1) % 4)
+                    self.R.append(start + (offset + 1) % 4)
+                    self.U.append(self.U[col])
+                    self.D.append(col)
+                    self.D[self.U[col]] = node
+                    self.U[col] = node
+                    self.C.append(col)
+                    self.candidate.append((cell, n))
+                    self.S[col] += 1
+
+    # returns (iterations, seconds) like Board.solve, the solution is written into board
+    def solve(self, board: list[int], monitor: 'Board' = None) -> tuple[int, float]:
+        time_start = perf_counter()
+        solutions, counter = self.search(board, 1, monitor=monitor)
+        return (counter, (perf_counter() - time_start)) if solutions else (None, None)
+
+    # returns (solutions found, iterations), stops as soon as limit solutions are found
+    # the first solution is written into board, candidates in exclude are (cell, digit) pairs taken out beforehand
+    # monitor gets the progress and can stop the search through stop_requested (see Board.request_stop)
+    def search(
+        self, board: list[int], limit: int, exclude: tuple[tuple[int, int]] = (), monitor: 'Board' = None
+    ) -> tuple[int, int]:
+        L, R, U, D, C, S = self.L.copy(), self.R.copy(), self.U.copy(), self.D.copy(), self.C, self.S.copy()
+        candidate, size = self.candidate, self.size
+
+        def cover(col: int):
+            R[L[col]], L[R[col]] = R[col], L[col]
+            i = D[col]
+            while i != col:
+                j = R[i]
+                while j != i:
+                    U[D[j]], D[U[j]] = U[j], D[j]
+                    S[C[j]] -= 1
+                    j = R[j]
+                i = D[i]
+
+        def uncover(col: int):
+            i = U[col]
+            while i != col:
+                j = L[i]
+                while j != i:
+                    S[C[j]] += 1
+                    U[D[j]], D[U[j]] = j, j
+                    j = L[j]
+                i = U[i]
+            R[L[col]], L[R[col]] = col, col
+
+        for cell, n in exclude:
+            node = self.first[cell * size + n - 1]
+            for j in range(node, node + 4):
+                U[D[j]], D[U[j]] = U[j], D[j]
+                S[C[j]] -= 1
+
+        covered = set()
+        for cell in range(len(board)):
+            if board[cell]:
+                node = self.first[cell * size + board[cell] - 1]
+                for j in range(node, node + 4):
+                    if C[j] in covered:  # two clues fighting over one constraint
+                        return (0, 0)
+                    covered.add(C[j])
+                    cover(C[j])
 
+        counter = 0
+        solutions = 0
+        solution = None
+        stack = []
+        stats = monitor.stats if monitor is not None else None
+        while True:
+            counter += 1
+            if monitor is not None and not counter & 0xFFF:
+                monitor.progress = counter
+                if monitor.stop_requested:
+                    return (0, counter)
+            if R[0] == 0:
+                solutions += 1
+                if solution is None:
+                    solution = stack.copy()
+                    if stats is not None:
+                        stats.reached(len(stack))
+                smallest = 0  # keep searching by treating it as a dead end
+            else:
+                col, smallest, j = R[0], size + 1, R[0]
+                while j:
+                    if S[j] < smallest:
+                        col, smallest = j, S[j]
+                    j = R[j]
+
+            if solutions >= limit:
+                break
+
+            if smallest:
+                cover(col)
+                node = D[col]
+                stack.append(node)
+                j = R[node]
+                while j != node:
+                    cover(C[j])
+                    j = R[j]
+                continue
+
+            # dead end, move the deepest choice to its next row or drop it
+            if stats is not None and R[0]:
+                stats.dead_end(len(stack))
+            while stack:
+                node = stack.pop()
+                j = L[node]
+                while j != node:
+                    uncover(C[j])
+                    j = L[j]
+                col = C[node]
+                node = D[node]
+                if node != col:
+                    stack.append(node)
+                    j = R[node]
+                    while j != node:
+                        cover(C[j])
+                        j = R[j]
+                    break
+                uncover(col)
+            else:
+                break
+
+        for node in solution or ():
+            cell, n = candidate[node]
+            board[cell] = n
+        return (solutions, counter)
+
+
+FROM_ASCII = bytes.maketrans(b'0123456789', bytes(range(10)))
+TO_ASCII = bytes.maketrans(bytes(range(10)), b'0123456789')
+BOX_SIZES = (2, 3, 4, 5)  # 4 x 4 up to 25 x 25
+
+
+# (c_row, c_col, c_reg, peers, units, cell_units) for an N x N board with N = box * box,
+# units are N rows, N columns, N boxes, cell_units[i] is (c_row[i], c_col[i], c_reg[i]) in a single lookup
+@lru_cache
+def unit_tables(
+    box: int
+) -> tuple[list[int], list[int], list[int], list[tuple[int]], list[list[int]], list[tuple[int, int, int]]]:
+    size = box * box
+    cells = range(size * size)
+    c_row = [i // size for i in cells]
+    c_col = [size + i % size for i in cells]
+    c_reg = [2 * size + i // (size * box) * box + i % size // box for i in cells]
+    peers = [
+        tuple(j for j in cells if j != i and (c_row[i] == c_row[j] or c_col[i] == c_col[j] or c_reg[i] == c_reg[j]))
+        for i in cells
+    ]
+    units = [[i for i in cells if u in (c_row[i], c_col[i], c_reg[i])] for u in range(3 * size)]
+    cell_units = [(c_row[i], c_col[i], c_reg[i]) for i in cells]
+    return (c_row, c_col, c_reg, peers, units, cell_units)
+
+
+# a dict that works out (and keeps) the value of a mask the first time it's looked up
+class _LazyTable(dict):
+    def __init__(self, function: callable):
+        super().__init__()
+        self.function = function
+
+    def __missing__(self, mask: int) -> int:
+        value = self[mask] = self.function(mask)
+        return value
+
+
+# (popcount, ctz) with popcount[mask] the number of set bits and ctz[mask] the lowest set bit (__builtin_ctz),
+# plain lists over all 2^(size + 1) masks up to 16 x 16 (2^10 for 9 x 9), 25 x 25 would need 2^26 of them
+# so it gets _LazyTables that only hold the masks the search actually meets
+@lru_cache
+def bit_tables(size: int) -> tuple[list[int], list[int]]:
+    if size > 16:
+        return (_LazyTable(int.bit_count), _LazyTable(lambda mask: (mask & -mask).bit_length() - 1))
+    popcount, ctz = [0] * (1 << (size + 1)), [0] * (1 << (size + 1))
+    for mask in range(1, len(popcount)):
+        popcount[mask] = popcount[mask >> 1] + (mask & 1)
+        ctz[mask] = 0 if mask & 1 else ctz[mask >> 1] + 1
+    return (popcount, ctz)
+
+
+# the cells are a bytearray (81 bytes instead of 81 list slots), the lookup tables are shared by every board
+# of the same size, box is the side of a box: 3 for the usual 9 x 9, 4 for 16 x 16, 5 for 25 x 25
+# digits go from 1 to size, the masks use bits 1 - size (full is 0x3FE for 9 x 9)
 class Board():
-    def __init__(self):
-        self.board = [0] * 81
-        self.c_row = [i // 9 for i in range(81)]
-        self.c_col = [9 + i % 9 for i in range(81)]
-        self.c_reg = [18 + (i // 27 * 3) + (i % 9 // 3) for i in range(81)]
+    __slots__ = (
+        'board', 'used', 'holder', 'use_MRV', 'use_dynamic_MRV', 'use_propagation', 'propagated', 'progress',
+        'stop_requested', 'use_LCV', 'use_DLX', 'dlx', 'stats', 'candidates',
+        'box', 'size', 'cells', 'full', 'c_row', 'c_col', 'c_reg', 'peers', 'units', 'cell_units', 'popcount', 'ctz'
+    )
+
+    def __init__(self, box: int = 3):
+        if box not in BOX_SIZES:
+            raise ValueError(f'unsupported box size {box}, expected one of {", ".join(map(str, BOX_SIZES))}')
+        self.box, self.size = box, box * box
+        self.cells = self.size * self.size
+        self.full = (1 << (self.size + 1)) - 2
+        self.c_row, self.c_col, self.c_reg, self.peers, self.units, self.cell_units = unit_tables(box)
+        self.popcount, self.ctz = bit_tables(self.size)
+        self.board = bytearray(self.cells)
+        self.used = [0] * (3 * self.size)  # bit n set = n is somewhere in that row / column / box
+        self.holder = [-1] * (3 * self.size * (self.size + 1))  # holder[(size + 1) * unit + n] holds n in that unit
         self.use_MRV = False
+        self.use_dynamic_MRV = False
+        self.use_propagation = False
+        self.propagated = 0
+        self.progress = 0  # iterations so far, only updated every few thousand of them
+        self.stop_requested = False
         self.use_LCV = False
+        self.use_DLX = False
+        self.dlx = None
+        self.stats: SolveStats | None = None  # see stats.py, None turns every hook off
+        self.candidates = None  # see hints.py, only the GUI's board keeps one up to date
 
     def __repr__(self) -> list[int]:
         return self.board
 
     def __str__(self) -> str:
-        string = ''
-        for row in range(3):
-            for col in range(9):
-                offset = col * 3 + row * 27
-                string += f'{self.board[offset]} {self.board[offset + 1]} {self.board[offset + 2]}'
-                string += (' | ' if (col + 1) % 3 else '\n')
-            string += ('——————+———————+——————\n' if row != 2 else '')
-
-        return string.replace('0', '.')
+        box, size = self.box, self.size
+        width = len(str(size))
+        rows = []
+        for r in range(size):
+            values = [f'{v:>{width}}' if v else '.' * width for v in self.board[r * size:(r + 1) * size]]
+            rows.append(' | '.join(' '.join(values[c:c + box]) for c in range(0, size, box)))
+        separator = '-+-'.join(['-' * (box * (width + 1) - 1)] * box)
+        bands = ['\n'.join(rows[r:r + box]) for r in range(0, size, box)]
+        return f'\n{separator}\n'.join(bands) + '\n'
 
     def __getitem__(self, key: int) -> int:
         return self.board[key]
 
+    # keeps used / holder in sync, so value should be valid there (see is_cell_valid) or 0
     def __setitem__(self, key: int, value: int):
+        old = self.board[key]
         self.board[key] = value
+        stride = self.size + 1
+        for unit in (self.c_row[key], self.c_col[key], self.c_reg[key]):
+            if old and self.holder[stride * unit + old] == key:
+                self.used[unit] &= ~(1 << old)
+                self.holder[stride * unit + old] = -1
+            if value:
+                self.used[unit] |= 1 << value
+                self.holder[stride * unit + value] = key
+        if self.candidates is not None:
+            self.candidates.cell_changed(key)
+
+    # replaces every cell at once, for anything that builds a whole board outside of the Board
+    def set_board(self, board: bytes | list[int]):
+        self.board = bytearray(board)
+        self.update_used()
+
+    # an immutable copy of the cells (81 bytes for 9 x 9), set_board takes it back
+    def snapshot(self) -> bytes:
+        return bytes(self.board)
+
+    def update_used(self):
+        stride = self.size + 1
+        used, holder = [0] * (3 * self.size), [-1] * (3 * self.size * stride)
+        for key, value in enumerate(self.board):
+            if value:
+                for unit in (self.c_row[key], self.c_col[key], self.c_reg[key]):
+                    used[unit] |= 1 << value
+                    holder[stride * unit + value] = key
+        self.used, self.holder = used, holder
+        if self.candidates is not None:
+            self.candidates.rebuild()
+
+    # a new board with the same cells and settings, so it can be solved away from the GUI
+    def copy(self) -> 'Board':
+        board = Board(self.box)
+        board.board = self.board.copy()
+        board.used, board.holder = self.used.copy(), self.holder.copy()
+        board.use_MRV, board.use_dynamic_MRV, board.use_LCV = self.use_MRV, self.use_dynamic_MRV, self.use_LCV
+        board.use_propagation, board.use_DLX, board.dlx = self.use_propagation, self.use_DLX, self.dlx
+        board.stats = self.stats
+        return board
+
+    # the solvers check this every few thousand iterations and give up with (None, None)
+    def request_stop(self):
+        self.stop_requested = True
 
     def set_use_MRV(self, value: bool):
         self.use_MRV = value
 
+    def set_use_dynamic_MRV(self, value: bool):
+        self.use_dynamic_MRV = value
+
+    def set_use_propagation(self, value: bool):
+        self.use_propagation = value
+
     def set_use_LCV(self, value: bool):
         self.use_LCV = value
 
+    def set_use_DLX(self, value: bool):
+        self.use_DLX = value
+
+    # picks one of ENGINES by name, for everything that isn't driven by the checkboxes
+    def set_engine(self, engine: str):
+        if engine not in ENGINES:
+            raise ValueError(f'unknown engine \'{engine}\', expected one of {", ".join(ENGINES)}')
+        self.use_MRV = engine == 'mrv'
+        self.use_dynamic_MRV = engine == 'dynamic_mrv'
+        self.use_propagation = engine == 'propagation'
+        self.use_DLX = engine == 'dlx'
+
+    # the engine solve() would run, the name set_engine takes (with +lcv if LCV is on)
+    def engine(self) -> str:
+        if self.use_DLX:
+            return 'dlx'
+        engine = 'propagation' if self.use_propagation else 'dynamic_mrv' if self.use_dynamic_MRV else (
+            'mrv' if self.use_MRV else 'plain'
+        )
+        return engine + '+lcv' if self.use_LCV else engine
+
+    # EXPERIMENT (scanning the cells): RCB: 677k, RBC: 607k, CRB: 714k, CBR: 665k, BRC: 542k, BCR: 544k [iter/s]
+    # occupancy bitmasks instead (no scanning): 237k -> 2.9M checks/s, measured on a slower machine than the above
     def is_cell_valid(self, key: int, value: int) -> bool:
-        # EXPERIMENT: RCB: 677k, RBC: 607k, CRB: 714k, CBR: 665k, BRC: 542k, BCR: 544k [iter/s]
-        r = key // 9
-        c = key % 9
-        b = 27 * (r // 3) + 3 * (c // 3)
-        row = (self.board[9 * r + i] for i in range(9))
-        column = (self.board[9 * i + c] for i in range(9))
-        box = (self.board[9 * (i // 3) + b + i % 3] for i in range(9))
+        return not (self.used[self.c_row[key]] | self.used[self.c_col[key]] | self.used[self.c_reg[key]]) >> value & 1
 
-        return not (value in column or value in row or value in box)  # CRB: 714k, the fastest way probably
+    # the cells in key's row, column and box that already hold value
+    def conflicts(self, key: int, value: int) -> list[int]:
+        stride = self.size + 1
+        cells = {self.holder[stride * unit + value] for unit in (self.c_row[key], self.c_col[key], self.c_reg[key])}
+        return sorted(cells - {-1})
 
+    # the timestamps are only taken when stats are on, off costs a None check per call
     def heuristic_MRV(self, zeros: list[int], masks: list[int]):
-        candidates = [masks[self.c_row[i]] & masks[self.c_col[i]] & masks[self.c_reg[i]] for i in zeros]
-        candidate_pairs = [(bin(i).count('1'), j) for i, j in zip(candidates, zeros)]
-        return [c[1] for c in sorted(candidate_pairs)]
+        time_start = perf_counter() if self.stats is not None else 0.0
+        candidates = [masks[r] & masks[c] & masks[b] for r, c, b in (self.cell_units[i] for i in zeros)]
+        candidate_pairs = [(self.popcount[i], j) for i, j in zip(candidates, zeros)]
+        order = [c[1] for c in sorted(candidate_pairs)]
+        if self.stats is not None:
+            self.stats.ordering_seconds += perf_counter() - time_start
+        return order
+
+    # values sorted by how many empty peers would lose them as a candidate, least constraining first
+    def heuristic_LCV(self, key: int, possible: int, masks: list[int], board: list[int] = None) -> list[int]:
+        time_start = perf_counter() if self.stats is not None else 0.0
+        c_row, c_col, c_reg = self.c_row, self.c_col, self.c_reg
+        board = self.board if board is None else board
+        peer_candidates = [
+            masks[c_row[p]] & masks[c_col[p]] & masks[c_reg[p]] for p in self.peers[key] if not board[p]
+        ]
+        value_pairs = [
+            (sum(1 for c in peer_candidates if c & (1 << n)), n) for n in range(1, self.size + 1) if possible & (1 << n)
+        ]
+        order = [v[1] for v in sorted(value_pairs)]
+        if self.stats is not None:
+            self.stats.lcv_seconds += perf_counter() - time_start
+        return order
 
-    # WARNING: BLAZINGLY FAST !!!
     def solve(self, random_gen: bool = False) -> tuple[int, float]:
-        time_start = perf_counter()
+        self.progress = 0
+        stats = self.stats
+        if stats is not None:
+            stats.reset('plain' if random_gen else self.engine())
+
         if 0 not in self.board:
-            return (0, 0.0001)
+            result = (0, 0.0001)
+        elif self.use_DLX and not random_gen:
+            result = self.solve_DLX()
+        elif self.use_propagation and not random_gen:
+            result = self.solve_propagation()
+        elif self.use_dynamic_MRV and not random_gen:
+            result = self.solve_dynamic_MRV()
+        else:
+            result = self.solve_backtracking(random_gen)
 
+        if stats is not None:
+            stats.finish(*result)
+        return result
+
+    # WARNING: BLAZINGLY FAST !!!
+    # plain (or statically sorted with MRV) backtracking, the depth is the position in zeros
+    def solve_backtracking(self, random_gen: bool = False) -> tuple[int, float]:
+        time_start = perf_counter()
+        stats = self.stats
+        board, cell_units, ctz, full = self.board, self.cell_units, self.ctz, self.full
         n = 1
         counter = 0
-        masks = [0x3FE] * 27
-        mask_history = [0x3FE] * 81
-
-        for i in range(81):
-            bit_shift = ~(1 << self.board[i])
-            masks[self.c_row[i]] &= bit_shift
-            masks[self.c_col[i]] &= bit_shift
-            masks[self.c_reg[i]] &= bit_shift
+        masks = [full] * (3 * self.size)
+        mask_history = [full] * self.cells
+        use_LCV = self.use_LCV and not random_gen
+        value_order = [None] * self.cells
+
+        for i in range(self.cells):
+            r, c, b = cell_units[i]
+            bit_shift = ~(1 << board[i])
+            masks[r] &= bit_shift
+            masks[c] &= bit_shift
+            masks[b] &= bit_shift
 
         if random_gen:
-            zeros = list(range(81))
-            zero_ptr = zeros.index(self.board.index(0))
+            zeros = list(range(self.cells))
+            zero_ptr = zeros.index(board.index(0))
         else:
-            zeros = [key for key, value in enumerate(self.board) if value == 0]
+            zeros = [key for key, value in enumerate(board) if value == 0]
             zero_ptr = 0
             if self.use_MRV:
                 zeros = self.heuristic_MRV(zeros, masks)
 
         current = zeros[zero_ptr]
+        r, c, b = cell_units[current]
         max_zero_ptr = len(zeros) - 1
 
         while 0 <= zero_ptr <= max_zero_ptr:
             counter += 1
-            possible = (
-                mask_history[current]
-                & masks[self.c_row[current]]
-                & masks[self.c_col[current]]
-                & masks[self.c_reg[current]]
-            )  # THANK YOU FLAKE8
+            if not counter & 0x3FFF:
+                self.progress = counter
+                if self.stop_requested:
+                    return (None, None)
+            possible = mask_history[current] & masks[r] & masks[c] & masks[b]
 
             if possible:
-                n = bin(possible)[::-1].index('1')  # __builtin_ctz(possible)
-                self.board[current] = n
+                if use_LCV:
+                    if mask_history[current] == full:  # first visit since the last backtrack
+                        value_order[current] = self.heuristic_LCV(current, possible, masks)
+                    n = next(v for v in value_order[current] if possible & (1 << v))
+                else:
+                    n = ctz[possible]
+                board[current] = n
 
                 bit_shift = ~(1 << n)
                 mask_history[current] &= bit_shift
-                masks[self.c_row[current]] &= bit_shift
-                masks[self.c_col[current]] &= bit_shift
-                masks[self.c_reg[current]] &= bit_shift
+                masks[r] &= bit_shift
+                masks[c] &= bit_shift
+                masks[b] &= bit_shift
 
                 zero_ptr += 1
                 if zero_ptr > max_zero_ptr:
                     break
                 current = zeros[zero_ptr]
+                r, c, b = cell_units[current]
             else:
-                mask_history[current] = 0x3FE
+                if stats is not None:
+                    stats.dead_end(zero_ptr)
+                mask_history[current] = full
                 zero_ptr -= 1
                 if zero_ptr < 0:
                     break
                 current = zeros[zero_ptr]
-                n = self.board[current]
-                self.board[current] = 0
+                r, c, b = cell_units[current]
+                n = board[current]
+                board[current] = 0
 
                 bit_shift = 1 << n
-                masks[self.c_row[current]] |= bit_shift
-                masks[self.c_col[current]] |= bit_shift
-                masks[self.c_reg[current]] |= bit_shift
-
-        if n <= 9:
+                masks[r] |= bit_shift
+                masks[c] |= bit_shift
+                masks[b] |= bit_shift
+
+        if zero_ptr >= 0:  # below 0 means every value of the first cell failed, there's no solution
+            if stats is not None:
+                stats.reached(len(zeros))
+            self.update_used()
             return (counter, (perf_counter() - time_start))
         else:
             return (None, None)
 
+    # picks the most constrained cell at every step instead of sorting them once at the start
+    def solve_dynamic_MRV(self) -> tuple[int, float]:
+        time_start = perf_counter()
+        stats = self.stats
+        board, peers, cell_units, ctz = self.board, self.peers, self.cell_units, self.ctz
+        use_LCV = self.use_LCV
+        counter = 0
+        masks = [self.full] * (3 * self.size)
+
+        for i in range(self.cells):
+            r, c, b = cell_units[i]
+            bit_shift = ~(1 << board[i])
+            masks[r] &= bit_shift
+            masks[c] &= bit_shift
+            masks[b] &= bit_shift
+
+        # buckets[k] holds every empty cell with exactly k candidates left, counts[i] is the bucket of cell i
+        counts = [0] * self.cells
+        buckets = [set() for _ in range(self.size + 1)]
+        for i in range(self.cells):
+            if not board[i]:
+                r, c, b = cell_units[i]
+                counts[i] = self.popcount[masks[r] & masks[c] & masks[b]]
+                buckets[counts[i]].add(i)
+        empty = sum(len(b) for b in buckets)
+
+        # every frame is [cell, values not tried yet, peers whose count dropped after the current placement, LCV order]
+        stack = []
+
+        while True:
+            counter += 1
+            if not counter & 0x3FFF:
+                self.progress = counter
+                if self.stop_requested:
+                    return (None, None)
+            if not empty:
+                if stats is not None:
+                    stats.reached(len(stack))
+                self.update_used()
+                return (counter, (perf_counter() - time_start))
+
+            k = 0
+            while not buckets[k]:
+                k += 1
+            if k:
+                current = buckets[k].pop()
+                empty -= 1
+                r, c, b = cell_units[current]
+                possible = masks[r] & masks[c] & masks[b]
+                order = self.heuristic_LCV(current, possible, masks) if use_LCV else None
+                stack.append([current, possible, [], order])
+            elif stats is not None:  # some empty cell has no candidate left
+                stats.dead_end(len(stack))
+
+            while stack:
+                frame = stack[-1]
+                current, possible, changed, order = frame
+                r, c, b = cell_units[current]
+                if board[current]:
+                    bit_shift = 1 << board[current]
+                    board[current] = 0
+                    masks[r] |= bit_shift
+                    masks[c] |= bit_shift
+                    masks[b] |= bit_shift
+                    for p in changed:
+                        buckets[counts[p]].remove(p)
+                        counts[p] += 1
+                        buckets[counts[p]].add(p)
+                    changed.clear()
+
+                if possible:
+                    if order:
+                        n = next(v for v in order if possible & (1 << v))
+                    else:
+                        n = ctz[possible]
+                    bit_shift = 1 << n
+                    frame[1] = possible & ~bit_shift
+                    board[current] = n
+                    for p in peers[current]:
+                        if not board[p]:
+                            pr, pc, pb = cell_units[p]
+                            if masks[pr] & masks[pc] & masks[pb] & bit_shift:
+                                buckets[counts[p]].remove(p)
+                                counts[p] -= 1
+                                buckets[counts[p]].add(p)
+                                changed.append(p)
+                    masks[r] &= ~bit_shift
+                    masks[c] &= ~bit_shift
+                    masks[b] &= ~bit_shift
+                    break
+
+                # every value failed, give the cell back to its bucket and backtrack further
+                stack.pop()
+                buckets[counts[current]].add(current)
+                empty += 1
+                counter += 1
+            else:
+                return (None, None)
+
+    # the search as a stream of events for the GUI to replay, ('place', cell, value) or ('backtrack', cell, 0)
+    # always the cell with the fewest candidates next, straight on self.board so it can be drawn between any two events
+    # returns the number of placements, None when there's no solution or a stop was requested
+    def solve_steps(self):
+        used, c_row, c_col, c_reg, full = self.used, self.c_row, self.c_col, self.c_reg, self.full
+        popcount = self.popcount
+        remaining = {i for i in range(self.cells) if not self.board[i]}
+        stack = []  # [cell, values still to try], the last one is tried first
+        placed = 0
+
+        while remaining:
+            if self.stop_requested:
+                return None
+            current = min(
+                remaining, key=lambda i: popcount[full & ~(used[c_row[i]] | used[c_col[i]] | used[c_reg[i]])]
+            )
+            possible = full & ~(used[c_row[current]] | used[c_col[current]] | used[c_reg[current]])
+            remaining.discard(current)
+            stack.append([current, [n for n in range(self.size, 0, -1) if possible & (1 << n)]])
+
+            while stack:
+                cell, values = stack[-1]
+                if self.board[cell]:
+                    self[cell] = 0
+                    yield ('backtrack', cell, 0)
+                if values:
+                    n = values.pop()
+                    self[cell] = n
+                    placed += 1
+                    self.progress = placed
+                    yield ('place', cell, n)
+                    break
+                stack.pop()
+                remaining.add(cell)
+            else:
+                return None
+
+        return placed
+
+    # naked and hidden singles over the unit masks (27 for 9 x 9)
+    # returns the number of resolved cells or None on a contradiction
+    def propagate(self, board: list[int], masks: list[int]) -> int | None:
+        c_row, c_col, c_reg, cell_units, ctz = self.c_row, self.c_col, self.c_reg, self.cell_units, self.ctz
+        resolved = 0
+        changed = True
+
+        while changed:
+            changed = False
+            for i in range(self.cells):
+                if board[i]:
+                    continue
+                r, c, b = cell_units[i]
+                possible = masks[r] & masks[c] & masks[b]
+                if not possible:
+                    return None
+                if not possible & (possible - 1):  # naked single
+                    board[i] = ctz[possible]
+                    masks[r] &= ~possible
+                    masks[c] &= ~possible
+                    masks[b] &= ~possible
+                    resolved += 1
+                    changed = True
+
+            for u, unit in enumerate(self.units):
+                missing = masks[u]
+                if not missing:
+                    continue
+                # a hidden single only takes its own digit away from the other cells, so the candidates of the
+                # unit's cells can be worked out once for all of its digits
+                cands = [0 if board[i] else masks[c_row[i]] & masks[c_col[i]] & masks[c_reg[i]] for i in unit]
+                while missing:
+                    bit_shift = missing & -missing
+                    missing &= ~bit_shift
+                    spots = [k for k, cand in enumerate(cands) if cand & bit_shift]
+                    if not spots:
+                        return None
+                    if len(spots) == 1:  # hidden single
+                        k = spots[0]
+                        i = unit[k]
+                        cands[k] = 0
+                        board[i] = ctz[bit_shift]
+                        r, c, b = cell_units[i]
+                        masks[r] &= ~bit_shift
+                        masks[c] &= ~bit_shift
+                        masks[b] &= ~bit_shift
+                        resolved += 1
+                        changed = True
+
+        return resolved
+
+    # propagation before and after every branch, counter only counts the branching iterations
+    def solve_propagation(self) -> tuple[int, float]:
+        time_start = perf_counter()
+        stats = self.stats
+        c_row, c_col, c_reg, popcount = self.c_row, self.c_col, self.c_reg, self.popcount
+        counter = 0
+        self.propagated = 0
+        masks = [self.full] * (3 * self.size)
+
+        for i in range(self.cells):
+            bit_shift = ~(1 << self.board[i])
+            masks[c_row[i]] &= bit_shift
+            masks[c_col[i]] &= bit_shift
+            masks[c_reg[i]] &= bit_shift
+
+        stack = [(self.board.copy(), masks, 0)]
+        while stack:
+            board, masks, depth = stack.pop()
+            resolved = self.propagate(board, masks)
+            if resolved is None:
+                if stats is not None:
+                    stats.dead_end(depth)
+                continue
+            self.propagated += resolved
+            if 0 not in board:
+                if stats is not None:
+                    stats.reached(depth)
+                    stats.propagated = self.propagated
+                self.set_board(board)
+                return (counter, (perf_counter() - time_start))
+
+            counter += 1
+            self.progress = counter
+            if self.stop_requested:
+                return (None, None)
+            time_ordering = perf_counter() if stats is not None else 0.0
+            current = min(
+                (i for i in range(self.cells) if not board[i]),
+                key=lambda i: popcount[masks[c_row[i]] & masks[c_col[i]] & masks[c_reg[i]]]
+            )
+            if stats is not None:
+                stats.ordering_seconds += perf_counter() - time_ordering
+            possible = masks[c_row[current]] & masks[c_col[current]] & masks[c_reg[current]]
+            if self.use_LCV:
+                values = self.heuristic_LCV(current, possible, masks, board)
+            else:
+                values = [n for n in range(1, self.size + 1) if possible & (1 << n)]
+            for n in reversed(values):  # pushed in reverse so the first value is tried first
+                new_board, new_masks = board.copy(), masks.copy()
+                new_board[current] = n
+                new_masks[c_row[current]] &= ~(1 << n)
+                new_masks[c_col[current]] &= ~(1 << n)
+                new_masks[c_reg[current]] &= ~(1 << n)
+                stack.append((new_board, new_masks, depth + 1))
+
+        return (None, None)
+
+    def solve_DLX(self) -> tuple[int, float]:
+        if self.dlx is None:  # the matrix is the same for every board, build it only once
+            self.dlx = DancingLinks(self.box)
+        board = self.board.copy()
+        count, dt = self.dlx.solve(board, self)
+        if count is not None:
+            self.set_board(board)
+        return (count, dt)
+
+    # 0 means no solution, 1 a unique one, limit means there are at least that many
+    def count_solutions(self, limit: int = 2) -> int:
+        if self.dlx is None:
+            self.dlx = DancingLinks(self.box)
+        return self.dlx.search(self.board.copy(), limit)[0]
+
     def generate_random(self, perc: int):
-        self.board = [0] * 81
+        if self.size > 9:
+            self.generate_full_large()
+            self.remove_clues(round(self.cells * perc / 100))
+            return
+
+        self.clear()
+        used, c_row, c_col, c_reg = self.used, self.c_row, self.c_col, self.c_reg
         candidates = ['Rajski ogród']
         filled_cells = []
 
-        while candidates and self.board[80] == 0:
+        while candidates and self.board[-1] == 0:
             filled_cells.append(self.board.index(0))
             current = filled_cells[-1]
-            candidates = [i for i in range(1, 10) if self.is_cell_valid(current, i)]
-            self.board[current] = random.choice(candidates) if candidates else 0
+            taken = used[c_row[current]] | used[c_col[current]] | used[c_reg[current]]
+            candidates = [i for i in range(1, self.size + 1) if not taken >> i & 1]
+            self[current] = random.choice(candidates) if candidates else 0
 
         self.solve(random_gen=True)
-        # self.board = [0 if random.randint(1, 100) > int(perc) else i for i in self.board]
-
+        self.remove_clues(round(self.cells * perc / 100))
+
+    # random fill + plain backtracking gets lost on 16 x 16 and up, so the boxes on the diagonal (which never share a
+    # row or column) get shuffled digits and DLX fills in the rest, trying again in the rare case that it can't
+    def generate_full_large(self):
+        if self.dlx is None:
+            self.dlx = DancingLinks(self.box)
+        while True:
+            board = bytearray(self.cells)
+            for b in range(self.box):
+                digits = random.sample(range(1, self.size + 1), self.size)
+                for i in range(self.size):
+                    board[(b * self.box + i // self.box) * self.size + b * self.box + i % self.box] = digits[i]
+            if self.dlx.search(board, 1)[0]:
+                self.set_board(board)
+                return
+
+    # takes clues away in random order as long as the solution stays unique, stops at target clues
+    # (or earlier when no clue can be removed anymore, a unique 9 x 9 sudoku needs at least 17, or a stop is requested)
+    def remove_clues(self, target: int):
+        if self.dlx is None:
+            self.dlx = DancingLinks(self.box)
+        board, c_row, c_col, c_reg = self.board, self.c_row, self.c_col, self.c_reg
+        clues = self.cells - board.count(0)
+        masks = [self.full] * (3 * self.size)
+        for i in range(self.cells):
+            bit_shift = ~(1 << board[i])
+            masks[c_row[i]] &= bit_shift
+            masks[c_col[i]] &= bit_shift
+            masks[c_reg[i]] &= bit_shift
+
+        order = [i for i in range(self.cells) if board[i]]
+        random.shuffle(order)
+        for i in order:
+            if clues <= target or self.stop_requested:
+                break
+            n = board[i]
+            bit_shift = 1 << n
+            board[i] = 0
+            masks[c_row[i]] |= bit_shift
+            masks[c_col[i]] |= bit_shift
+            masks[c_reg[i]] |= bit_shift
+
+            # the puzzle was unique before, so it still is if no solution puts anything else than n in this cell
+            # n being the only candidate left for the cell is the cheap way to know that, no search needed
+            if (
+                masks[c_row[i]] & masks[c_col[i]] & masks[c_reg[i]] == bit_shift
+                or not self.dlx.search(board.copy(), 1, ((i, n),))[0]
+            ):
+                clues -= 1
+            else:
+                board[i] = n
+                masks[c_row[i]] &= ~bit_shift
+                masks[c_col[i]] &= ~bit_shift
+                masks[c_reg[i]] &= ~bit_shift
+        self.update_used()
+
+    # one digit per cell up to 9 x 9 ('0' or '.' when empty),
+    # bigger boards use len(str(size)) digits per cell ('00' - '16' for 16 x 16)
+    # the board only changes if string is valid
     def import_(self, string: str) -> bool:
-        if len(string) != 81 or not string.isdigit():
+        width = len(str(self.size))
+        if width == 1:
+            string = string.replace('.', '0')
+        if len(string) != width * self.cells or not string.isascii() or not string.isdigit():
             return False
 
-        self.board, old_grid = [int(i) for i in string], self.board
-        for key in range(81):
-            value, self.board[key] = self.board[key], 0
-            bool_valid = self.is_cell_valid(key, value) or not value
-            self.board[key] = value
-            if not bool_valid:
-                self.board = old_grid
-                return False
+        if width == 1:
+            board = bytearray(string.encode().translate(FROM_ASCII))
+        else:
+            board = bytearray(int(string[i:i + width]) for i in range(0, len(string), width))
+        if max(board) > self.size:
+            return False
 
+        stride = self.size + 1
+        used, holder = [0] * (3 * self.size), [-1] * (3 * self.size * stride)
+        for key, value in enumerate(board):
+            if value:
+                units = (self.c_row[key], self.c_col[key], self.c_reg[key])
+                if (used[units[0]] | used[units[1]] | used[units[2]]) >> value & 1:
+                    return False
+                for unit in units:
+                    used[unit] |= 1 << value
+                    holder[stride * unit + value] = key
+
+        self.board, self.used, self.holder = board, used, holder
+        if self.candidates is not None:
+            self.candidates.rebuild()
         return True
 
     def export(self) -> str:
-        return ''.join(str(i) for i in self.board)
+        if self.size <= 9:
+            return self.board.translate(TO_ASCII).decode()
+        width = len(str(self.size))
+        return ''.join(f'{value:0{width}}' for value in self.board)
 
     def clear(self):
-        self.board = [0] * 81
+        self.board = bytearray(self.cells)
+        self.used, self.holder = [0] * (3 * self.size), [-1] * (3 * self.size * (self.size + 1))
+        if self.candidates is not None:
+            self.candidates.rebuild()
 
 
 if __name__ == "__main__":
     board = Board()
-    board.board = [int(i) for i in "020000300000000010000400009203048090600000800890000000300007902702000401000000000"]
+    board.import_("020000300000000010000400009203048090600000800890000000300007902702000401000000000")
     print(str(board))
     board.generate_random(100)
     print(str(board))
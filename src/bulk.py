@@ -0,0 +1,99 @@
+import sys
+from itertools import islice
+from multiprocessing import Pool
+from pathlib import Path
+from time import perf_counter
+from src.board import Board
+
+'''
+Streaming import and export of whole pattern collections, to and from the pattern library (storage.py).
+    lines: one puzzle per line, optionally followed by whitespace and a name, '#' starts a comment line
+    sdm:   one puzzle per line and nothing else
+Puzzles can use '0' or '.' for empty cells, the library always stores '0'. Board size follows from the length.
+Lines are read, validated (on a process pool) and inserted BLOCK lines at a time, so memory stays flat however
+long the file is. Every rejected line is reported with its line number.
+'''
+
+FORMATS = ('lines', 'sdm')
+BLOCK = 8192
+
+_boards = {}
+
+
+# returns (line number, board string or None, name or error)
+def _check_line(numbered: tuple[int, str, str]) -> tuple[int, str | None, str]:
+    number, line, fmt = numbered
+    puzzle, name = (line.split(None, 1) + [''])[:2]
+    if fmt == 'sdm' and name:
+        return (number, None, 'error: sdm lines hold a puzzle only')
+    box = {16: 2, 81: 3, 512: 4, 1250: 5}.get(len(puzzle))
+    if box is None:
+        return (number, None, 'error: not a puzzle length')
+    if box not in _boards:
+        _boards[box] = Board(box)
+    board = _boards[box]
+    try:
+        if not board.import_(puzzle):
+            return (number, None, 'error: invalid puzzle')
+    except Exception as e:
+        return (number, None, f'error: {type(e).__name__}')
+    return (number, board.export(), name.strip())
+
+
+def import_stream(store, lines, prefix: str, fmt: str = 'lines', errors=sys.stderr, processes: int = None) -> dict:
+    if fmt not in FORMATS:
+        raise ValueError(f'unknown format \'{fmt}\', expected one of {", ".join(FORMATS)}')
+    time_start = perf_counter()
+    stats = {'lines': 0, 'imported': 0, 'duplicates': 0, 'failed': 0}
+    numbered = (
+        (number, line, fmt) for number, line in enumerate(lines, 1) if line.strip() and not line.startswith('#')
+    )
+
+    with Pool(processes) as pool:
+        while block := list(islice(numbered, BLOCK)):
+            patterns = []
+            for number, board, name in pool.map(_check_line, block, chunksize=256):
+                if board is None:
+                    errors.write(f'line {number}: {name}\n')
+                    stats['failed'] += 1
+                else:
+                    patterns.append((name or f'{prefix} {number}', board))
+            added = store.add_many(patterns)
+            stats['lines'] += len(block)
+            stats['imported'] += added
+            stats['duplicates'] += len(patterns) - added
+
+    stats['seconds'] = perf_counter() - time_start
+    return stats
+
+
+def import_file(store, path: str, fmt: str = None, **kwargs) -> dict:
+    fmt = fmt or ('sdm' if path.endswith('.sdm') else 'lines')
+    with open(path, 'r') as f:
+        return import_stream(store, f, Path(path).stem, fmt, **kwargs)
+
+
+# dots writes '.' for empty cells (9 x 9 and smaller only, bigger boards need every digit)
+def export_stream(store, out, fmt: str = 'lines', dots: bool = False) -> int:
+    if fmt not in FORMATS:
+        raise ValueError(f'unknown format \'{fmt}\', expected one of {", ".join(FORMATS)}')
+    count = 0
+    for name, board in store.items():
+        if dots and len(board) <= 81:
+            board = board.replace('0', '.')
+        out.write(f'{board} {name}\n' if fmt == 'lines' else f'{board}\n')
+        count += 1
+    return count
+
+
+def export_file(store, path: str, fmt: str = None, dots: bool = False) -> int:
+    fmt = fmt or ('sdm' if path.endswith('.sdm') else 'lines')
+    with open(path, 'w') as f:
+        return export_stream(store, f, fmt, dots)
+
+
+def report(stats: dict) -> str:
+    return (
+        f'{stats["lines"]} line(s), {stats["imported"]} imported, {stats["duplicates"]} name(s) already taken, '
+        f'{stats["failed"]} failed in {stats["seconds"]:.3f}s'
+    )
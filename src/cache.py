@@ -0,0 +1,117 @@
+import json
+from collections import OrderedDict
+from itertools import permutations
+from pathlib import Path
+
+'''
+LRU cache of solutions keyed by a canonical form of the puzzle.
+The canonical form is the smallest string over 288 transformations (band order, stack order, reversing the rows,
+reversing the columns, transposing, which together also cover the rotations and mirrors)
+after relabelling the digits in order of first appearance.
+Other row swaps inside a band (or column swaps inside a stack) aren't folded, those puzzles just get their own key.
+'''
+
+
+def _line_orders() -> list[list[int]]:
+    orders = []
+    for bands in permutations(range(3)):
+        for reverse in (False, True):
+            order = [3 * b + i for b in bands for i in range(3)]
+            orders.append(order[::-1] if reverse else order)
+    return orders
+
+
+# every transformation as a list of source indices, output cell k comes from input cell TRANSFORMS[t][k]
+TRANSFORMS = [
+    [9 * c + r if transpose else 9 * r + c for r in rows for c in cols]
+    for transpose in (False, True) for rows in _line_orders() for cols in _line_orders()
+]
+
+
+# returns (canonical puzzle, transformation, labels) where labels maps the puzzle's digits to canonical ones
+def canonical(puzzle: str) -> tuple[str, list[int], dict[str, str]]:
+    best, best_transform, best_labels = None, None, None
+    for transform in TRANSFORMS:
+        labels = {'0': '0'}
+        cells = []
+        for k in transform:
+            digit = puzzle[k]
+            if digit not in labels:
+                labels[digit] = str(len(labels))
+            cells.append(labels[digit])
+        candidate = ''.join(cells)
+        if best is None or candidate < best:
+            best, best_transform, best_labels = candidate, transform, labels
+    return (best, best_transform, best_labels)
+
+
+class SolutionCache():
+    def __init__(self, maxsize: int = 1024, path: str = None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.entries = OrderedDict()  # canonical puzzle -> canonical solution, least recently used first
+        if path is not None and Path(path).exists():
+            with open(path, 'r') as f:
+                for key, solution in json.load(f):
+                    self.entries[key] = solution
+            while len(self.entries) > maxsize:
+                self.entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, puzzle: str) -> str | None:
+        key, transform, labels = canonical(puzzle)
+        solution = self.entries.get(key)
+        if solution is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+
+        # digits missing from the puzzle can take any of the leftover labels
+        digits = {label: digit for digit, label in labels.items()}
+        leftover = iter(d for d in '123456789' if d not in labels)
+        result = [''] * 81
+        for k, source in enumerate(transform):
+            label = solution[k]
+            if label not in digits:
+                digits[label] = next(leftover)
+            result[source] = digits[label]
+        return ''.join(result)
+
+    def put(self, puzzle: str, solution: str):
+        key, transform, labels = canonical(puzzle)
+        labels = labels.copy()
+        cells = []
+        for source in transform:
+            digit = solution[source]
+            if digit not in labels:
+                labels[digit] = str(len(labels))
+            cells.append(labels[digit])
+        self.entries[key] = ''.join(cells)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self.entries),
+            'maxsize': self.maxsize,
+        }
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = 0
+
+    def save(self, path: str = None):
+        path = path or self.path
+        if path is not None:
+            with open(path, 'w') as f:
+                json.dump(list(self.entries.items()), f)
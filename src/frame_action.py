@@ -1,4 +1,13 @@
-from src import tk, MainGUI, SaveWindow, ImportWindow, ExportWindow, RenameWindow, DeleteWindow, RandomWindow
+from __future__ import annotations
+from threading import Thread
+from time import perf_counter
+from typing import TYPE_CHECKING
+from src.board import TO_ASCII
+from src.rater import rate
+from src import tk, SaveWindow, ImportWindow, ExportWindow, RenameWindow, DeleteWindow, RandomWindow
+
+if TYPE_CHECKING:
+    from src.gui import MainGUI
 
 
 class ActionButton(tk.Button):
@@ -15,8 +24,16 @@ class ActionFrame(tk.Frame):
         self._board = gui.main_board
         self._board_frame = gui.board_frame
         self._pt_listbox = gui.pattern_frame
-        self.pre_solve_board = [0] * 81
+        self.pre_solve_board = bytes(81)
         self.selected_pattern = None
+        self.solver = None  # copy of the board that gets solved on a worker thread
+        self.solve_result = None
+        self.solve_start = 0.0
+        self.use_cache = True  # off when comparing engines, a cached board would never reach a solver again
+        self.replay = None  # Board.solve_steps() generator while solving step by step
+        self.replay_job = None  # the pending after() of the next frame, None when paused
+        self.replay_steps = 0
+        self.replay_backtracks = 0
 
         self.settings_label = tk.Label(self, text='Actions:')
         self.settings_label.grid(column=1, columnspan=2)
@@ -32,10 +49,17 @@ class ActionFrame(tk.Frame):
         self.bt_delete = ActionButton(self, 'Delete', 3, 1, lambda: self.open_onListbox(DeleteWindow))
         self.bt_solve = ActionButton(self, 'Solve', 5, 0, self.on_press_solve)
         self.bt_random = ActionButton(self, 'Random', 5, 1, lambda: RandomWindow(self._gui))
-        self.bt_undo = ActionButton(self, 'Undo solve', 6, 0, self.on_press_undo)
+        self.bt_undo = ActionButton(self, 'Undo', 6, 0, self.on_press_undo)
         self.bt_clear = ActionButton(self, 'Clear', 6, 1, self.on_press_clear)
         self.bt_theme = ActionButton(self, 'Next theme', 7, 0, self._gui.set_next_theme)
         self.bt_manual = ActionButton(self, 'Manual', 7, 1, lambda: None)
+        self.bt_cancel = ActionButton(self, 'Cancel', 8, 0, self.on_press_cancel)
+        self.bt_redo = ActionButton(self, 'Redo', 8, 1, self.on_press_redo)
+        self.bt_visualize = ActionButton(self, 'Step solve', 9, 0, self.on_press_visualize)
+        self.bt_pause = ActionButton(self, 'Pause', 9, 1, self.on_press_pause)
+        self.bt_step = ActionButton(self, 'Step', 10, 0, self.on_press_step)
+        self.bt_fast = ActionButton(self, 'Fast forward', 10, 1, self.on_press_fast)
+        self.bt_hint = ActionButton(self, 'Hint', 11, 0, self.on_press_hint)
 
     def set_theme(self, bg: str):
         self['bg'] = bg
@@ -54,9 +78,16 @@ class ActionFrame(tk.Frame):
             'solve': self.bt_solve,
             'random': self.bt_random,
             'undo': self.bt_undo,
+            'redo': self.bt_redo,
             'clear': self.bt_clear,
             'theme': self.bt_theme,
-            'manual': self.bt_manual
+            'manual': self.bt_manual,
+            'cancel': self.bt_cancel,
+            'visualize': self.bt_visualize,
+            'pause': self.bt_pause,
+            'step': self.bt_step,
+            'fast': self.bt_fast,
+            'hint': self.bt_hint
         }
 
         for bt_name in all_buttons:
@@ -70,33 +101,265 @@ class ActionFrame(tk.Frame):
     def on_press_load(self):
         self.selected_pattern = self._pt_listbox.get_selection()
         if self.selected_pattern is not None:
-            loaded_board = self._pt_listbox.patterns[self.selected_pattern]
-            self._gui.set_info_text('pattern_load', self.selected_pattern)
-            self._board.import_(loaded_board)
+            patterns = self._pt_listbox.patterns
+            loaded_board = patterns[self.selected_pattern]
+            snapshot = self._board.snapshot()
+            if not self._board.import_(loaded_board):  # saved from a board of another size
+                self._gui.set_info_text('pattern_load_size', self.selected_pattern)
+                return
+            self._gui.history.push(snapshot)
+            if self._board.size == 9:  # the rater only knows 9 x 9
+                rating = patterns.rating(self.selected_pattern)
+                if rating is None:  # rated once, then cached next to the pattern
+                    rating = rate(loaded_board)
+                    patterns.set_ratings([(self.selected_pattern, *rating)])
+                self._gui.set_info_text('pattern_load', self.selected_pattern, self.solution_status(), *rating)
+            else:
+                self._gui.set_info_text('pattern_load_unrated', self.selected_pattern, self.solution_status())
             self._board_frame.update_all()
             self._pt_listbox.unfocus()
 
+    def solution_status(self) -> str:
+        return ('no solution', 'unique solution', 'multiple solutions')[self._board.count_solutions(2)]
+
+    # the search runs on a worker thread, the Tk thread only polls it with after() so the window stays alive
     def on_press_solve(self):
-        self.pre_solve_board = self._board.board.copy()  # copying values instead of a reference (important!!)
-        count, dt = self._board.solve()
-        if (count, dt) != (None, None):
-            self._gui.set_info_text('board_solve', count, f'{dt:.3f}', count / dt)
+        self.pre_solve_board = self._board.snapshot()
+        # the cache's canonical form is 9 x 9 only, and recording stats needs a real solve
+        use_cache = self.use_cache and self._board.size == 9 and self._board.stats is None
+        cached = self._gui.solution_cache.get(self._board.export()) if use_cache else None
+        if cached is not None:
+            stats = self._gui.solution_cache.stats()
+            self._gui.remember()
+            self._board.set_board([int(i) for i in cached])
+            self._gui.set_info_text('board_solve_cached', stats['hits'], stats['misses'])
+            self._gui.set_states_on_event('solve')
+            self._board_frame.update_after_solve(self.pre_solve_board)
+            self._pt_listbox.unfocus()
+            return
+
+        self.solver = self._board.copy()
+        self.solve_result = None
+        self.solve_start = perf_counter()
+        self._gui.set_states_on_event('solving')
+        self._gui.set_info_text('board_solving', 0, '0.0', 0)
+        Thread(target=self.run_solver, daemon=True).start()
+        self.after(100, self.poll_solver)
+
+    # anything the solver raises still has to end poll_solver, it's reported as a failed solve
+    def run_solver(self):
+        try:
+            self.solve_result = self.solver.solve()
+        except Exception:
+            self.solve_result = (None, None)
+
+    def poll_solver(self):
+        if self.solve_result is None:
+            dt = perf_counter() - self.solve_start
+            progress = self.solver.progress
+            self._gui.set_info_text('board_solving', progress, f'{dt:.1f}', progress / dt)
+            self.after(100, self.poll_solver)
+            return
+
+        count, dt = self.solve_result
+        if self.solver.stats is not None:
+            self._gui.config_frame.show_stats(self.solver.stats)
+        if self.solver.stop_requested:
+            self._gui.set_states_on_event('normal')
+            self._gui.set_info_text('board_cancel')
+        elif (count, dt) != (None, None):
+            if self._board.size == 9:
+                self._gui.solution_cache.put(self.pre_solve_board.translate(TO_ASCII).decode(), self.solver.export())
+            self._gui.remember()
+            self._board.set_board(self.solver.board)
+            self._board.propagated = self.solver.propagated
+            if self._board.use_propagation:
+                self._gui.set_info_text('board_solve_prop', count, f'{dt:.3f}', count / dt, self._board.propagated)
+            else:
+                self._gui.set_info_text('board_solve', count, f'{dt:.3f}', count / dt)
             self._gui.set_states_on_event('solve')
             self._board_frame.update_after_solve(self.pre_solve_board)
         else:
+            self._gui.set_states_on_event('normal')
+            self._gui.set_info_text('board_fail')
+        self.solver = None
+        self._pt_listbox.unfocus()
+
+    # generating runs on a worker thread too, removing clues from a 16 x 16 down to 35% takes ~ 20s
+    def start_random(self, percent: int):
+        self.solver = self._board.copy()
+        self.solve_result = None
+        self.solve_start = perf_counter()
+        self._gui.set_states_on_event('solving')
+        self._gui.set_info_text('pattern_random_busy', '0.0')
+        Thread(target=self.run_generator, args=(percent,), daemon=True).start()
+        self.after(100, self.poll_generator)
+
+    def run_generator(self, percent: int):
+        try:
+            self.solver.generate_random(percent)
+            self.solve_result = (0, perf_counter() - self.solve_start)
+        except Exception as e:
+            self.solve_result = (None, type(e).__name__)
+
+    def poll_generator(self):
+        if self.solve_result is None:
+            self._gui.set_info_text('pattern_random_busy', f'{perf_counter() - self.solve_start:.1f}')
+            self.after(100, self.poll_generator)
+            return
+
+        self._gui.set_states_on_event('normal')
+        if self.solver.stop_requested:
+            self._gui.set_info_text('pattern_random_cancel')
+        elif self.solve_result[0] is None:
+            self._gui.set_info_text('pattern_random_fail', self.solve_result[1])
+        else:
+            self._gui.remember()
+            self._board.set_board(self.solver.board)
+            self._board_frame.update_all()
+            self._gui.set_info_text('pattern_random')
+        self.solver = None
+        self._pt_listbox.unfocus()
+
+    def on_press_cancel(self):
+        if self.solver is not None:
+            self.solver.request_stop()
+        if self.replay is not None:
+            self.stop_replay()
+            self._board.set_board(self.pre_solve_board)
+            self._board_frame.update_all()
+            self._gui.set_states_on_event('normal')
+            self._gui.set_info_text('board_cancel')
+
+    # the search runs as a generator on the main board, each frame pulls up to 'steps per frame' events from it
+    # and draws the board once, so events between two frames are merged and drawing costs nothing per event
+    def on_press_visualize(self):
+        self.pre_solve_board = self._board.snapshot()
+        self._gui.remember()
+        self._board.stop_requested = False
+        self.replay = self._board.solve_steps()
+        self.replay_steps = self.replay_backtracks = 0
+        self._gui.set_states_on_event('replaying')
+        self.bt_pause['text'] = 'Pause'
+        self.replay_frame()
+
+    def replay_frame(self):
+        self.replay_job = None
+        if self.advance_replay(self._gui.config_frame.steps_per_frame.get()):
+            self.replay_job = self.after(1000 // self._gui.config_frame.frame_rate.get(), self.replay_frame)
+
+    # pulls count events and schedules one redraw, False once the search is over
+    def advance_replay(self, count: int) -> bool:
+        last_cell = None
+        try:
+            for _ in range(count):
+                kind, last_cell, _ = next(self.replay)
+                if kind == 'place':
+                    self.replay_steps += 1
+                else:
+                    self.replay_backtracks += 1
+        except StopIteration as end:
+            self.finish_replay(end.value)
+            return False
+        self._board_frame.update_step(self.pre_solve_board, last_cell)
+        key = 'board_replay_pause' if self.bt_pause['text'] == 'Resume' else 'board_replay'
+        self._gui.set_info_text(key, self.replay_steps, self.replay_backtracks)
+        return True
+
+    def finish_replay(self, placed: int | None):
+        self.stop_replay()
+        if placed is None:
+            self._board.set_board(self.pre_solve_board)
+            self._board_frame.update_all()
+            self._gui.set_states_on_event('normal')
             self._gui.set_info_text('board_fail')
+            return
+        self._gui.set_states_on_event('solve')
+        self._gui.set_info_text('board_replay_done', self.replay_steps, self.replay_backtracks)
+        self._board_frame.update_after_solve(self.pre_solve_board)
         self._pt_listbox.unfocus()
 
+    def stop_replay(self):
+        if self.replay_job is not None:
+            self.after_cancel(self.replay_job)
+            self.replay_job = None
+        self.replay = None
+
+    def on_press_pause(self):
+        if self.replay is None:
+            return
+        if self.replay_job is not None:
+            self.after_cancel(self.replay_job)
+            self.replay_job = None
+            self.bt_pause['text'] = 'Resume'
+            self._gui.set_info_text('board_replay_pause', self.replay_steps, self.replay_backtracks)
+        else:
+            self.bt_pause['text'] = 'Pause'
+            self.replay_frame()
+
+    # one event at a time, pauses first if it's still playing
+    def on_press_step(self):
+        if self.replay is None:
+            return
+        if self.replay_job is not None:
+            self.on_press_pause()
+        self.advance_replay(1)
+
+    # as many events as fit in about 50ms per frame, still one redraw per frame so the window stays alive
+    def on_press_fast(self):
+        if self.replay is None:
+            return
+        if self.replay_job is not None:
+            self.after_cancel(self.replay_job)
+        self.bt_pause['text'] = 'Pause'
+        self.replay_job = self.after(1, self.fast_frame)
+
+    def fast_frame(self):
+        self.replay_job = None
+        frame_end = perf_counter() + 0.05
+        while perf_counter() < frame_end:
+            if not self.advance_replay(256):
+                return
+        self.replay_job = self.after(1, self.fast_frame)
+
     def on_press_clear(self):
         self._gui.set_states_on_event('normal')
         self._gui.set_info_text('board_clear')
+        self._gui.remember()
         self._board.clear()
         self._board_frame.update_all()
         self._pt_listbox.unfocus()
 
+    # the candidates are kept up to date as the board changes (hints.py), so a hint is only a lookup
+    def on_press_hint(self):
+        if 0 not in self._board.board:
+            self._gui.set_info_text('hint_full')
+            return
+        hint = self._board.candidates.hint()
+        if hint is None:
+            self._gui.set_info_text('hint_none')
+            return
+        cell, n, technique = hint
+        size = self._board.size
+        where = f'r{cell // size + 1}c{cell % size + 1}'
+        if n:
+            self._gui.set_info_text('hint', f'{n} goes in {where}', technique)
+        else:
+            self._gui.set_info_text('hint_stuck', where)
+        self._board_frame.cells[cell].focus_set()
+
     def on_press_undo(self):
+        self.restore(self._gui.history.undo(self._board.snapshot()), 'board_undo', 'board_no_undo')
+
+    def on_press_redo(self):
+        self.restore(self._gui.history.redo(self._board.snapshot()), 'board_redo', 'board_no_redo')
+
+    def restore(self, snapshot: bytes | None, info_key: str, empty_key: str):
+        if snapshot is None:
+            self._gui.set_info_text(empty_key)
+            return
         self._gui.set_states_on_event('normal')
-        self._gui.set_info_text('board_undo')
-        self._board.board, self.pre_solve_board = self.pre_solve_board, [0] * 81
+        self._gui.set_info_text(info_key)
+        self._board.set_board(snapshot)
         self._board_frame.update_all()
         self._pt_listbox.unfocus()
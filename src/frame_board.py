@@ -1,39 +1,86 @@
+from __future__ import annotations
 import platform
-from src import tk, MainGUI
+from time import monotonic
+from typing import TYPE_CHECKING
+from src import tk
+
+if TYPE_CHECKING:
+    from src.gui import MainGUI
+
+DIGIT_FONT = 'TkDefaultFont'
+PENCIL_FONT = ('Courier', 6)
+DIGIT_TIMEOUT = 1.0  # seconds within which a second key press makes a two-digit value
 
 
 class Cell(tk.Button):
     def __init__(self, master: tk.Frame, gui: MainGUI, index: int):
-        width = {'Linux': 1, 'Windows': 2}.get(platform.uname().system, 1)
+        box, size = gui.main_board.box, gui.main_board.size
+        width = {'Linux': 1, 'Windows': 2}.get(platform.uname().system, 1) + (size > 9)
         super().__init__(width=width, height=1, master=master, text=' ', command=self.on_click)
+        self.digit_width = width
 
         self._gui = gui
         self._board = gui.main_board
         self.index = index
-        # scary math to see if it's in an odd-numbered sector
-        self.uses_color_1 = bool((3 * (index // 27) + index % 9 // 3) % 2)
+        # scary math to see if it's in an odd-numbered sector (row of boxes + column of boxes, like a checkerboard)
+        self.uses_color_1 = bool((index // (size * box) + index % size // box) % 2)
         self.configure(disabledforeground='black')
+        self.shown = {  # the options as Tk has them right now
+            'text': ' ', 'disabledforeground': 'black', 'width': width, 'height': 1, 'font': DIGIT_FONT
+        }
+        self.first_digit = 0  # a digit that can still become the tens of a two-digit value, 0 for none
+        self.first_time = 0.0
         self.bind('<KeyPress>', self.new_value)
 
+    # only the options that differ from what's on screen go to Tk, in a single configure call
+    def show(self, **options):
+        changed = {key: value for key, value in options.items() if self.shown.get(key) != value}
+        if changed:
+            self.shown.update(changed)
+            self.configure(**changed)
+
     def on_click(self):
         self._gui.set_info_text('empty')
         self.focus_set()
 
+    # on boards bigger than 9 x 9 a second digit typed within DIGIT_TIMEOUT extends the first one when the result
+    # fits ('1' then '6' is 16, '1' then '0' is 10), so every value up to size can be typed, a lone '0' clears
     def new_value(self, event=None):
-        if event.char.isdigit():
-            if event.char == '0':
-                self._gui.set_info_text('empty')
-                self._board[self.index] = 0
-                self['text'] = ' '
-            elif self._board.is_cell_valid(self.index, int(event.char)):
-                self._gui.set_info_text('empty')
-                self._board[self.index] = int(event.char)
-                self['text'] = event.char
-            else:
-                self._gui.set_info_text('invalid', event.char)
+        if not event.char or event.char not in '0123456789':
+            return
+        size, digit, now = self._board.size, int(event.char), monotonic()
+        first, self.first_digit = self.first_digit, 0
+        if first and now - self.first_time <= DIGIT_TIMEOUT and 10 * first + digit <= size:
+            value = 10 * first + digit
+        else:
+            value = digit
+            if size > 9 and 1 <= digit <= size // 10:
+                self.first_digit, self.first_time = digit, now
+
+        if value == 0:
+            self._gui.set_info_text('empty')
+            if self._board[self.index]:
+                self._gui.remember()
+            self._board[self.index] = 0
+            self.show_value()
+        elif self._board.is_cell_valid(self.index, value):
+            self._gui.set_info_text('empty')
+            self._gui.remember()
+            self._board[self.index] = value
+            self.show_value()
+        else:
+            clashes = self._board.conflicts(self.index, value)
+            self._gui.set_info_text('invalid', value, ', '.join(f'r{i // size + 1}c{i % size + 1}' for i in clashes))
+
+    # with pencil marks on the peers' marks change as well, the board redraw only touches the cells that differ
+    def show_value(self):
+        if self._gui.board_frame.pencil_marks:
+            self._gui.board_frame.update_all()
+        else:
+            self.show(text=str(self._board[self.index]) if self._board[self.index] else ' ')
 
     def set_bg_color(self, color_1, color_2):
-        self['bg'] = color_1 if self.uses_color_1 else color_2
+        self.show(bg=color_1 if self.uses_color_1 else color_2)
 
 
 class BoardFrame(tk.Frame):
@@ -43,24 +90,58 @@ class BoardFrame(tk.Frame):
         self._board = gui.main_board
         self.cells = []
 
-        for index in range(81):
+        size = self._board.size
+        for index in range(self._board.cells):
             cell = Cell(self, gui, index)
-            cell.grid(row=index // 9, column=index % 9)
+            cell.grid(row=index // size, column=index % size, sticky='nsew')
             self.cells.append(cell)
+        self.redraw_pending = False
+        self.pre_solve_state = None  # set by update_after_solve until the next redraw colours the solved cells
+        self.step_cell = None  # the cell of the last replayed solver event, drawn in red
+        self.pencil_marks = False  # empty cells show their candidates (board.candidates), up to 9 x 9
 
     def set_state(self, state: str):
         for cell in self.cells:
-            cell['state'] = state
+            cell.show(state=state)
 
     def set_theme(self, color_1: str, color_2: str):
         for cell in self.cells:
             cell.set_bg_color(color_1, color_2)
 
+    # both only schedule a redraw, however many updates come in one event-loop tick there's one redraw after them.
+    # Only Tk configure calls per redraw were counted (9 x 9 load 81 -> 28, solve 162 -> 53, undo 81 -> 53), the
+    # wall-clock latency wasn't measured: the machine this was written on has no display and no Xvfb. To measure it,
+    # time update_all() + update_idletasks() for load/solve/undo with and without the cell.shown diff.
     def update_all(self):
-        for index, cell in enumerate(self.cells):
-            cell['text'] = self._board[index] if self._board[index] else ' '
+        if not self.redraw_pending:
+            self.redraw_pending = True
+            self.after_idle(self.redraw)
+
+    def update_after_solve(self, pre_solve_state: bytes):
+        self.pre_solve_state = pre_solve_state
+        self.update_all()
+
+    def update_step(self, pre_solve_state: bytes, step_cell: int | None):
+        self.step_cell = step_cell
+        self.update_after_solve(pre_solve_state)
 
-    def update_after_solve(self, pre_solve_state: list[int]):
+    def redraw(self):
+        self.redraw_pending = False
+        board, pre_solve_state, self.pre_solve_state = self._board.board, self.pre_solve_state, None
+        step_cell, self.step_cell = self.step_cell, None
+        box, size = self._board.box, self._board.size
+        masks = self._board.candidates.masks if self.pencil_marks and size <= 9 else None
         for index, cell in enumerate(self.cells):
-            cell['disabledforeground'] = 'black' if pre_solve_state[index] else 'blue'
-            cell['text'] = self._board[index] if self._board[index] else ' '
+            if masks is not None and not board[index]:  # a box-shaped grid of the digits that still fit
+                digits = [str(n) if masks[index] >> n & 1 else ' ' for n in range(1, size + 1)]
+                text = '\n'.join(''.join(digits[r:r + box]) for r in range(0, size, box))
+                look = {'text': text, 'font': PENCIL_FONT, 'width': box, 'height': box}
+            else:
+                text = str(board[index]) if board[index] else ' '
+                look = {'text': text, 'font': DIGIT_FONT, 'width': cell.digit_width, 'height': 1}
+            if pre_solve_state is None:
+                cell.show(**look)
+            elif index == step_cell:
+                cell.show(**look, disabledforeground='red')
+            else:
+                cell.show(**look, disabledforeground='black' if pre_solve_state[index] else 'blue')
@@ -1,4 +1,10 @@
-from src import tk, MainGUI
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from src import tk
+from src.stats import SolveStats
+
+if TYPE_CHECKING:
+    from src.gui import MainGUI
 
 
 class ConfigBox(tk.Checkbutton):
@@ -22,11 +28,58 @@ class ConfigFrame(tk.Frame):
         self._label.grid()
 
         self.config_MRV = ConfigBox(self, "Use MRV heuristic", 1, self.set_use_MRV)
-        self.config_options = (self.config_MRV,)
+        self.config_dynamic_MRV = ConfigBox(self, "Use dynamic MRV", 2, self.set_use_dynamic_MRV)
+        self.config_propagation = ConfigBox(self, "Use propagation", 3, self.set_use_propagation)
+        self.config_LCV = ConfigBox(self, "Use LCV heuristic", 4, self.set_use_LCV)
+        self.config_DLX = ConfigBox(self, "Use DLX solver", 5, self.set_use_DLX)
+        self.config_stats = ConfigBox(self, "Record solver stats", 6, self.set_record_stats)
+        self.config_options = (
+            self.config_MRV, self.config_dynamic_MRV, self.config_propagation, self.config_LCV, self.config_DLX,
+            self.config_stats
+        )
+        self.stats_label = tk.Label(self, text='', justify='left', font='TkFixedFont')
+        self.stats_label.grid(row=7, sticky='w', padx=5)
+
+        # step by step solving: how often the board is drawn and how many solver events go into one drawing
+        self.frame_rate = tk.Scale(self, label='Replay frames/s', from_=1, to=60, orient='horizontal')
+        self.frame_rate.set(20)
+        self.frame_rate.grid(row=8, sticky='we', padx=5)
+        self.steps_per_frame = tk.Scale(self, label='Steps per frame', from_=1, to=1000, orient='horizontal')
+        self.steps_per_frame.grid(row=9, sticky='we', padx=5)
+        self.replay_scales = (self.frame_rate, self.steps_per_frame)
+        self.config_pencil = ConfigBox(self, "Show pencil marks", 10, self.set_pencil_marks)
+        self.config_no_cache = ConfigBox(self, "Skip the solution cache", 11, self.set_no_cache)
+        self.config_options += (self.config_pencil, self.config_no_cache)
 
     def set_use_MRV(self):
         self._board.use_MRV = self.config_MRV.value
 
+    def set_use_dynamic_MRV(self):
+        self._board.use_dynamic_MRV = self.config_dynamic_MRV.value
+
+    def set_use_propagation(self):
+        self._board.use_propagation = self.config_propagation.value
+
+    def set_use_LCV(self):
+        self._board.use_LCV = self.config_LCV.value
+
+    def set_use_DLX(self):
+        self._board.use_DLX = self.config_DLX.value
+
+    def set_pencil_marks(self):
+        self._gui.board_frame.pencil_marks = bool(self.config_pencil.value)
+        self._gui.board_frame.update_all()
+
+    def set_no_cache(self):
+        self._gui.action_frame.use_cache = not self.config_no_cache.value
+
+    def set_record_stats(self):
+        self._board.stats = SolveStats() if self.config_stats.value else None
+        self.stats_label['text'] = ''
+
+    def show_stats(self, stats: SolveStats):
+        self.stats_label['text'] = stats.summary()
+
     def set_state(self, state: str):
         for opt in self.config_options:
             opt['state'] = state
@@ -34,5 +87,9 @@ class ConfigFrame(tk.Frame):
     def set_theme(self, bg: str):
         self['bg'] = bg
         self._label['bg'] = bg
+        self.stats_label['bg'] = bg
         for opt in self.config_options:
             opt['bg'] = bg
+        for scale in self.replay_scales:
+            scale['bg'] = bg
+            scale['highlightbackground'] = bg
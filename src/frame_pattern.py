@@ -1,22 +1,44 @@
-from src import tk, json, MainGUI
+from __future__ import annotations
+from bisect import bisect_left, insort
+from typing import TYPE_CHECKING
+from src import tk, PatternStore
 
+if TYPE_CHECKING:
+    from src.gui import MainGUI
 
+
+# the listbox only ever holds the visible rows, scrolling and searching just move a window over self.filtered
 class PatternFrame(tk.Frame):
-    def __init__(self, gui: MainGUI):
+    def __init__(self, gui: MainGUI, rows: int = 15):
         super().__init__()
 
         self._gui = gui
+        self.rows = rows
+        self.offset = 0
         self.pattern_label = tk.Label(self, text='Your saved patterns:')
-        self.pattern_label.grid(sticky='n')
-        self.listbox = tk.Listbox(self, height=15)
-        self.listbox.grid(row=1)
+        self.pattern_label.grid(sticky='n', columnspan=2)
+
+        self.search_var = tk.StringVar(self)
+        self.search_var.trace_add('write', lambda *args: self.apply_filter())
+        self.search_entry = tk.Entry(self, textvariable=self.search_var)
+        self.search_entry.grid(row=1, columnspan=2, pady=(0, 5), sticky='we')
+
+        self.listbox = tk.Listbox(self, height=rows)
+        self.listbox.grid(row=2, column=0)
+        self.scrollbar = tk.Scrollbar(self, orient='vertical', command=self.on_scroll)
+        self.scrollbar.grid(row=2, column=1, sticky='ns')
+        self.listbox.bind('<MouseWheel>', lambda event: self.scroll_by(-event.delta // 120))
+        self.listbox.bind('<Button-4>', lambda event: self.scroll_by(-1))
+        self.listbox.bind('<Button-5>', lambda event: self.scroll_by(1))
 
-        with open('database.json', 'r') as f:
-            self.patterns = json.load(f)
-        self.update_patterns()
+        self.patterns = PatternStore()
+        self.names = self.patterns.names()  # sorted, kept in sync by add/rename/delete
+        self.filtered = self.names
+        self.render()
 
     def set_state(self, state: str):
         self.listbox['state'] = state
+        self.search_entry['state'] = state
 
     def set_theme(self, bg: str):
         self['bg'] = bg
@@ -29,36 +51,66 @@ class PatternFrame(tk.Frame):
     def unfocus(self):
         self.listbox.selection_clear(0, 'end')
 
-    def update_patterns(self):
+    def render(self):
+        self.offset = max(0, min(self.offset, len(self.filtered) - self.rows))
         old_state = self.listbox['state']
         self.listbox['state'] = 'normal'
         self.listbox.delete(0, 'end')
-        self.patterns = {i: self.patterns[i] for i in sorted(self.patterns)}
-
-        for pattern in self.patterns:
-            self.listbox.insert('end', pattern)
-        with open('database.json', 'w') as f:
-            json.dump(self.patterns, f, indent=4)
+        visible = self.filtered[self.offset:self.offset + self.rows]
+        if visible:
+            self.listbox.insert(0, *visible)
         self.listbox['state'] = old_state
 
+        total = max(len(self.filtered), 1)
+        self.scrollbar.set(self.offset / total, min(self.offset + self.rows, total) / total)
+
+    def scroll_by(self, lines: int) -> str:
+        self.offset += lines
+        self.render()
+        return 'break'
+
+    def on_scroll(self, action: str, amount: str, unit: str = 'units'):
+        if action == 'moveto':
+            self.offset = int(float(amount) * len(self.filtered))
+            self.render()
+        else:
+            self.scroll_by(int(amount) * (self.rows if unit == 'pages' else 1))
+
+    def apply_filter(self):
+        query = self.search_var.get().lower()
+        self.filtered = [name for name in self.names if query in name.lower()] if query else self.names
+        self.offset = 0
+        self.render()
+
+    # after something else wrote to the database (a bulk import)
+    def reload(self):
+        self.names = self.patterns.names()
+        self.apply_filter()
+
+    def update_patterns(self):
+        if self.search_var.get():
+            self.apply_filter()
+        else:
+            self.render()
+
     def add_pattern(self, name: str) -> bool:
-        add_successful = bool(name and name not in self.patterns)
+        add_successful = bool(name) and self.patterns.add(name, self._gui.main_board.export())
         if add_successful:
-            self.patterns[name] = self._gui.main_board.export()
+            insort(self.names, name)
             self.update_patterns()
         return add_successful
 
     def rename_pattern(self, name: str, new_name: str) -> bool:
-        rename_successful = bool(new_name and name in self.patterns and new_name not in self.patterns)
+        rename_successful = bool(new_name) and self.patterns.rename(name, new_name)
         if rename_successful:
-            self.patterns[new_name] = self.patterns[name]
-            self.patterns.pop(name)
+            self.names.pop(bisect_left(self.names, name))
+            insort(self.names, new_name)
             self.update_patterns()
         return rename_successful
 
     def delete_pattern(self, name: str) -> bool:
-        delete_successful = name and name in self.patterns
+        delete_successful = bool(name) and self.patterns.delete(name)
         if delete_successful:
-            self.patterns.pop(name)
+            self.names.pop(bisect_left(self.names, name))
             self.update_patterns()
         return delete_successful
@@ -1,8 +1,8 @@
-from src import json, tk, Board, ActionFrame, BoardFrame, ConfigFrame, PatternFrame
+from src import json, tk, Board, ActionFrame, BoardFrame, ConfigFrame, PatternFrame, SolutionCache, History, Candidates
 
 
 class MainGUI(tk.Tk):
-    def __init__(self):
+    def __init__(self, box: int = 3):
         super().__init__()
 
         self.resizable(False, False)
@@ -12,7 +12,10 @@ class MainGUI(tk.Tk):
         self.current_state = 'normal'
         self.current_theme = -1  # incremented to 0 when calling set_next_theme
         self.opened_window = None
-        self.main_board = Board()
+        self.main_board = Board(box)
+        self.main_board.candidates = Candidates(self.main_board)
+        self.solution_cache = SolutionCache(path='solutions.json')
+        self.history = History()
 
         with open('src/_themes.json', 'r') as f:
             self.themes = json.load(f)
@@ -31,6 +34,12 @@ class MainGUI(tk.Tk):
         self.set_next_theme()
         self.set_info_text('init')
         self.set_states_on_event('normal')
+        self.bind('<Control-z>', lambda event: self.action_frame.bt_undo.invoke())
+        self.bind('<Control-y>', lambda event: self.action_frame.bt_redo.invoke())
+
+    # call before anything changes the main board so it can be undone
+    def remember(self):
+        self.history.push(self.main_board.snapshot())
 
     def set_next_theme(self):
         self.current_theme += 1
@@ -53,13 +62,25 @@ class MainGUI(tk.Tk):
 
         if new_state == 'normal':  # clear, undo solve, close window
             self.board_frame.set_state('normal')
-            self.action_frame.set_states('disabled', ['undo'])
+            self.action_frame.set_states('disabled', ['cancel', 'pause', 'step', 'fast'])
             self.config_frame.set_state('normal')
             self.pattern_frame.set_state('normal')
 
         elif new_state == 'solve':
             self.board_frame.set_state('disabled')
-            self.action_frame.set_states('normal', ['save', 'export', 'undo', 'clear', 'theme', 'manual'])
+            self.action_frame.set_states('normal', ['save', 'export', 'undo', 'redo', 'clear', 'theme', 'manual'])
+            self.config_frame.set_state('disabled')
+            self.pattern_frame.set_state('disabled')
+
+        elif new_state == 'solving':
+            self.board_frame.set_state('disabled')
+            self.action_frame.set_states('normal', ['cancel'])
+            self.config_frame.set_state('disabled')
+            self.pattern_frame.set_state('disabled')
+
+        elif new_state == 'replaying':
+            self.board_frame.set_state('disabled')
+            self.action_frame.set_states('normal', ['cancel', 'pause', 'step', 'fast'])
             self.config_frame.set_state('disabled')
             self.pattern_frame.set_state('disabled')
 
@@ -73,19 +94,40 @@ class MainGUI(tk.Tk):
         args_0 = args[0] if len(args) >= 1 else None
         args_1 = args[1] if len(args) >= 2 else None
         args_2 = f'{args[2]:.1f}' if len(args) >= 3 else None
+        args_3 = args[3] if len(args) >= 4 else None
 
         label_dictionary = {
             'empty': '',
             'init': 'Click on a cell and press a number 0-9 on your keyboard to place it.',
-            'invalid': f'{args_0} is not valid in this location!',
+            'invalid': f'{args_0} is not valid in this location! (already in {args_1})',
             'theme_change': f'{self.themes[self.current_theme]['name']} theme selected.',
             'board_clear': 'The board has been cleared.',
-            'board_undo': 'Returned the board to its unsolved state.',
+            'board_undo': 'Undid the last change.',
+            'board_redo': 'Redid the last undone change.',
+            'board_no_undo': 'Nothing to undo.',
+            'board_no_redo': 'Nothing to redo.',
             'board_solve': f'Solved in {args_0} iteration(s) and {args_1}s ({args_2} iterations/s)',
+            'board_solve_prop': f'Solved in {args_0} branch(es) and {args_1}s ({args_3} cell(s) by propagation)',
+            'board_solve_cached': f'Solved from the cache ({args_0} hit(s), {args_1} miss(es) so far).',
+            'board_solving': f'Solving... {args_0} iteration(s) in {args_1}s ({args_2} iterations/s)',
+            'board_cancel': 'Solving cancelled.',
+            'board_replay': f'Solving step by step... {args_0} step(s), {args_1} backtrack(s)',
+            'board_replay_pause': f'Paused after {args_0} step(s), {args_1} backtrack(s).',
+            'board_replay_done': f'Solved step by step, {args_0} step(s) and {args_1} backtrack(s).',
             'board_fail': 'idk man seems kinda sus to me',
-            'pattern_load': f'Loaded \'{args_0}\'.',
+            'hint': f'Hint: {args_0} ({args_1}).',
+            'hint_stuck': f'{args_0} has no candidate left, a digit somewhere is wrong.',
+            'hint_none': 'No single left, the next step needs a harder technique.',
+            'hint_full': 'The board is already full.',
+            'pattern_load': f'Loaded \'{args_0}\' ({args_1}, difficulty {args_2}: {args_3}).',
+            'pattern_load_unrated': f'Loaded \'{args_0}\' ({args_1}).',
+            'pattern_load_size': f'\'{args_0}\' was saved from a board of another size.',
             'pattern_random': 'Generated a randomized sudoku.',
-            'pattern_import': 'Imported a sudoku pattern.',
+            'pattern_random_busy': f'Generating... {args_0}s',
+            'pattern_random_cancel': 'Generating cancelled.',
+            'pattern_random_fail': f'Generating failed ({args_0}).',
+            'pattern_import': f'Imported a sudoku pattern ({args_0}).',
+            'pattern_bulk': f'{args_0}',
             'pattern_save': f'Saved this pattern as \'{args_0}\'.',
             'pattern_rename': f'Renamed \'{args_0}\' to \'{args_1}\'.',
             'pattern_del_confirm': f'Deleted \'{args_0}\'.',
@@ -94,6 +136,8 @@ class MainGUI(tk.Tk):
         self.info_label['text'] = label_dictionary[key]
 
     def on_close_mainWindow(self):
+        self.action_frame.on_press_cancel()
+        self.solution_cache.save()
         self.destroy()
         if self.opened_window is not None:
             self.opened_window.destroy()
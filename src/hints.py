@@ -0,0 +1,76 @@
+'''
+Candidates of every cell, kept up to date one change at a time so hints and pencil marks never scan the board.
+Attach it with board.candidates = Candidates(board), Board.__setitem__ then calls cell_changed (the cell and its
+peers, 21 cells on 9 x 9) and whatever replaces the whole board calls rebuild.
+Besides the masks it keeps the cells with exactly one candidate (naked singles), the (unit, digit) pairs with exactly
+one possible cell (hidden singles) and the empty cells with no candidate at all, so hint() only has to pick one.
+'''
+
+
+class Candidates():
+    def __init__(self, board):
+        self.board = board
+        self.rebuild()
+
+    def rebuild(self):
+        board = self.board
+        self.stride = board.size + 1
+        self.masks = [0] * board.cells  # bit n set = n can go there, 0 for filled cells
+        self.counts = [0] * (3 * board.size * self.stride)  # counts[stride * unit + n]: cells in unit that can take n
+        self.naked = set()
+        self.hidden = set()  # stride * unit + n for every count of exactly 1
+        self.dead = set()
+        for key in range(board.cells):
+            self.update(key)
+
+    # only key and its peers can have different candidates after board[key] changed
+    def cell_changed(self, key: int):
+        self.update(key)
+        for p in self.board.peers[key]:
+            self.update(p)
+
+    def update(self, key: int):
+        board, used = self.board, self.board.used
+        units = (board.c_row[key], board.c_col[key], board.c_reg[key])
+        new = 0 if board.board[key] else board.full & ~(used[units[0]] | used[units[1]] | used[units[2]])
+        if board.board[key] or new:
+            self.dead.discard(key)
+        else:
+            self.dead.add(key)
+
+        old = self.masks[key]
+        if new == old:
+            return
+        self.masks[key] = new
+        if new and not new & (new - 1):
+            self.naked.add(key)
+        else:
+            self.naked.discard(key)
+
+        changed = old ^ new
+        while changed:
+            bit = changed & -changed
+            changed ^= bit
+            step = 1 if new & bit else -1
+            for unit in units:
+                slot = self.stride * unit + bit.bit_length() - 1
+                self.counts[slot] += step
+                if self.counts[slot] == 1:
+                    self.hidden.add(slot)
+                else:
+                    self.hidden.discard(slot)
+
+    # (cell, digit, technique) for a forced placement, hidden singles first like the rater does,
+    # (cell, 0, '') for an empty cell that nothing fits anymore, None when no single is left
+    def hint(self) -> tuple[int, int, str] | None:
+        if self.dead:
+            return (next(iter(self.dead)), 0, '')
+        if self.hidden:
+            unit, n = divmod(next(iter(self.hidden)), self.stride)
+            cell = next(i for i in self.board.units[unit] if self.masks[i] >> n & 1)
+            kind = ('row', 'column', 'box')[unit // self.board.size]
+            return (cell, n, f'hidden single, the only place for {n} in its {kind}')
+        if self.naked:
+            cell = next(iter(self.naked))
+            return (cell, self.masks[cell].bit_length() - 1, 'naked single, the only digit that fits that cell')
+        return None
@@ -0,0 +1,36 @@
+from collections import deque
+
+'''
+Undo / redo over board snapshots (Board.snapshot(), 81 immutable bytes each).
+Both stacks are bounded, the oldest snapshot falls off once there are maxlen of them,
+so a long session never holds more than 2 * maxlen * 81 bytes of boards.
+'''
+
+
+class History():
+    def __init__(self, maxlen: int = 200):
+        self.undo_stack = deque(maxlen=maxlen)
+        self.redo_stack = deque(maxlen=maxlen)
+
+    # call it with the board as it was right before a change, a new change forgets everything that could be redone
+    def push(self, snapshot: bytes):
+        if not self.undo_stack or self.undo_stack[-1] != snapshot:
+            self.undo_stack.append(snapshot)
+        self.redo_stack.clear()
+
+    # both return the board to go back to or None, current is the board as it is now
+    def undo(self, current: bytes) -> bytes | None:
+        if not self.undo_stack:
+            return None
+        self.redo_stack.append(current)
+        return self.undo_stack.pop()
+
+    def redo(self, current: bytes) -> bytes | None:
+        if not self.redo_stack:
+            return None
+        self.undo_stack.append(current)
+        return self.redo_stack.pop()
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
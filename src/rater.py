@@ -0,0 +1,188 @@
+from itertools import combinations
+
+'''
+Rates a puzzle by solving it the way a person would: always the easiest technique that makes progress.
+The score is the weight of the hardest technique needed (roughly the Sudoku Explainer scale),
+a puzzle that runs out of techniques needs 'backtracking' and gets BACKTRACKING_SCORE.
+'''
+
+ROWS = [list(range(r * 9, r * 9 + 9)) for r in range(9)]
+COLS = [list(range(c, 81, 9)) for c in range(9)]
+BOXES = [[27 * (b // 3) + 3 * (b % 3) + 9 * (i // 3) + i % 3 for i in range(9)] for b in range(9)]
+UNITS = ROWS + COLS + BOXES
+ROW_OF = [i // 9 for i in range(81)]
+COL_OF = [i % 9 for i in range(81)]
+BOX_OF = [i // 27 * 3 + i % 9 // 3 for i in range(81)]
+PEERS = [set().union(*(u for u in UNITS if i in u)) - {i} for i in range(81)]
+BITS = [1 << n for n in range(1, 10)]
+BACKTRACKING_SCORE = 10.0
+
+
+def popcount(mask: int) -> int:
+    return bin(mask).count('1')
+
+
+class Rater():
+    def __init__(self, string: str):
+        self.board = [int(i) for i in string]
+        self.cand = [0] * 81
+        self.valid = all(  # no digit twice in a unit
+            len(digits) == len(set(digits)) for digits in ([self.board[i] for i in u if self.board[i]] for u in UNITS)
+        )
+        for i in range(81):
+            if not self.board[i]:
+                self.cand[i] = 0x3FE
+                for p in PEERS[i]:
+                    self.cand[i] &= ~(1 << self.board[p])
+                self.valid &= bool(self.cand[i])
+
+    def place(self, i: int, n: int):
+        self.board[i] = n
+        self.cand[i] = 0
+        for p in PEERS[i]:
+            self.cand[p] &= ~(1 << n)
+
+    # removes bits from every cell in cells, returns True if anything changed
+    def eliminate(self, cells, mask: int) -> bool:
+        changed = False
+        for i in cells:
+            if self.cand[i] & mask:
+                self.cand[i] &= ~mask
+                changed = True
+        return changed
+
+    # singles place everything they find in one sweep, the other techniques stop after their first elimination
+    def hidden_single(self) -> bool:
+        placed = False
+        for unit in UNITS:
+            for bit in BITS:
+                spots = [i for i in unit if self.cand[i] & bit]
+                if len(spots) == 1:
+                    self.place(spots[0], bit.bit_length() - 1)
+                    placed = True
+        return placed
+
+    def naked_single(self) -> bool:
+        placed = False
+        for i in range(81):
+            if self.cand[i] and not self.cand[i] & (self.cand[i] - 1):
+                self.place(i, self.cand[i].bit_length() - 1)
+                placed = True
+        return placed
+
+    # a digit locked to one row or column inside a box can't be anywhere else on that line
+    def pointing(self) -> bool:
+        for box in BOXES:
+            for bit in BITS:
+                spots = [i for i in box if self.cand[i] & bit]
+                if len(spots) < 2:
+                    continue
+                for lines, line_of in ((ROWS, ROW_OF), (COLS, COL_OF)):
+                    if all(line_of[i] == line_of[spots[0]] for i in spots):
+                        line = lines[line_of[spots[0]]]
+                        if self.eliminate((i for i in line if BOX_OF[i] != BOX_OF[spots[0]]), bit):
+                            return True
+        return False
+
+    # a digit locked to one box inside a row or column can't be anywhere else in that box
+    def box_line(self) -> bool:
+        for line in ROWS + COLS:
+            for bit in BITS:
+                spots = [i for i in line if self.cand[i] & bit]
+                if len(spots) < 2:
+                    continue
+                if all(BOX_OF[i] == BOX_OF[spots[0]] for i in spots):
+                    if self.eliminate((i for i in BOXES[BOX_OF[spots[0]]] if i not in line), bit):
+                        return True
+        return False
+
+    # size cells of a unit sharing size candidates, those candidates go away from the rest of the unit
+    def naked_subset(self, size: int) -> bool:
+        for unit in UNITS:
+            cells = [i for i in unit if 2 <= popcount(self.cand[i]) <= size]
+            for group in combinations(cells, size):
+                mask = 0
+                for i in group:
+                    mask |= self.cand[i]
+                if popcount(mask) == size and self.eliminate((i for i in unit if i not in group), mask):
+                    return True
+        return False
+
+    # size candidates that only fit into the same size cells of a unit, everything else goes away from those cells
+    def hidden_subset(self, size: int) -> bool:
+        for unit in UNITS:
+            spots = {bit: [i for i in unit if self.cand[i] & bit] for bit in BITS}
+            bits = [bit for bit in BITS if 2 <= len(spots[bit]) <= size]
+            for group in combinations(bits, size):
+                cells = set().union(*(spots[bit] for bit in group))
+                mask = sum(group)
+                if len(cells) == size and self.eliminate(cells, 0x3FE & ~mask):
+                    return True
+        return False
+
+    # x-wing (size 2) and swordfish (size 3) over rows and columns
+    def fish(self, size: int) -> bool:
+        for lines, cross, cross_of in ((ROWS, COLS, COL_OF), (COLS, ROWS, ROW_OF)):
+            for bit in BITS:
+                positions = []
+                for line in lines:
+                    spots = {cross_of[i] for i in line if self.cand[i] & bit}
+                    if 2 <= len(spots) <= size:
+                        positions.append((line, spots))
+                for group in combinations(positions, size):
+                    covered = set().union(*(spots for _, spots in group))
+                    if len(covered) != size:
+                        continue
+                    base = set().union(*(line for line, _ in group))
+                    targets = (i for c in covered for i in cross[c] if i not in base)
+                    if self.eliminate(targets, bit):
+                        return True
+        return False
+
+    # returns (score, hardest technique), (0.0, 'invalid') for a board that contradicts itself
+    def rate(self) -> tuple[float, str]:
+        techniques = (
+            ('hidden single', 1.2, self.hidden_single),
+            ('naked single', 2.3, self.naked_single),
+            ('pointing', 2.6, self.pointing),
+            ('box/line reduction', 2.8, self.box_line),
+            ('naked pair', 3.0, lambda: self.naked_subset(2)),
+            ('hidden pair', 3.4, lambda: self.hidden_subset(2)),
+            ('naked triple', 3.6, lambda: self.naked_subset(3)),
+            ('x-wing', 3.8, lambda: self.fish(2)),
+            ('hidden triple', 4.0, lambda: self.hidden_subset(3)),
+            ('swordfish', 4.2, lambda: self.fish(3)),
+        )
+        score, hardest = 1.0, 'none'
+
+        while self.valid and 0 in self.board:
+            if any(self.board[i] == 0 and self.cand[i] == 0 for i in range(81)):
+                self.valid = False
+                break
+            for name, weight, technique in techniques:
+                if technique():
+                    if weight > score:
+                        score, hardest = weight, name
+                    break
+            else:
+                return (BACKTRACKING_SCORE, 'backtracking')
+
+        return (score, hardest) if self.valid else (0.0, 'invalid')
+
+
+def rate(string: str) -> tuple[float, str]:
+    return Rater(string).rate()
+
+
+# rates every pattern in store that has no cached rating yet, returns how many were rated
+def rate_library(store, processes: int = None, chunksize: int = 64) -> int:
+    from multiprocessing import Pool
+
+    unrated = store.unrated()
+    if not unrated:
+        return 0
+    names, boards = zip(*unrated)
+    with Pool(processes) as pool:
+        ratings = pool.map(rate, boards, chunksize)
+    store.set_ratings((name, score, technique) for name, (score, technique) in zip(names, ratings))
+    return len(names)
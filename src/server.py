@@ -0,0 +1,257 @@
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import Pool
+from threading import Condition, Lock, Thread
+from time import monotonic, perf_counter
+from urllib.parse import parse_qsl, urlsplit
+from src.board import Board
+
+'''
+Local HTTP solving service, standard library only (python -m src serve).
+    POST /solve     {"puzzle": "<81 digits>"}                 -> {"solution": "<81 digits>" or null, "iterations": ...}
+    POST /validate  {"puzzle": "<81 digits>"}                 -> {"valid": true, "complete": false}
+    POST /count     {"puzzle": "<81 digits>", "limit": 2}     -> {"count": 1}, limit at most MAX_COUNT_LIMIT
+    POST /generate  {"percent": 35}                           -> {"puzzle": "<81 digits>"}
+    GET  /stats                                               -> request counts, batching, latency and throughput
+Every endpoint also takes its fields as a query string (GET /solve?puzzle=...), puzzles use the export() format.
+Solve, count and generate requests that come in within WINDOW of each other go to the process pool as one batch
+(at most MAX_BATCH jobs), so a burst of small requests pays the pool round trip once instead of once per request.
+Validate is a single import_, it runs right in the request thread.
+'''
+
+WINDOW = 0.005  # seconds the first job of a batch waits for more
+MAX_BATCH = 256
+MAX_COUNT_LIMIT = 1000  # /count on an empty board with no cap would keep a worker busy for good
+LATENCY_SAMPLES = 1000  # the latency percentiles and the recent throughput are over the last this many requests
+
+_board = None
+
+
+def _init_worker():
+    global _board
+    _board = Board()
+    _board.set_engine('dlx')
+
+
+# (ok, response or error) for one (kind, puzzle, argument) job
+def _run_job(job: tuple[str, str | None, int | None]) -> tuple[bool, dict | str]:
+    kind, puzzle, argument = job
+    try:
+        if kind == 'generate':
+            _board.generate_random(argument)
+            return (True, {'puzzle': _board.export()})
+        if not _board.import_(puzzle):
+            return (False, 'invalid puzzle')
+        if kind == 'count':
+            return (True, {'count': _board.count_solutions(argument)})
+        count, dt = _board.solve()
+        if count is None:
+            return (True, {'solution': None})
+        return (True, {'solution': _board.export(), 'iterations': count, 'seconds': dt})
+    except Exception as e:
+        return (False, f'{type(e).__name__}')
+
+
+class Batcher():
+    def __init__(self, processes: int = None, window: float = WINDOW, max_batch: int = MAX_BATCH):
+        self.pool = Pool(processes, initializer=_init_worker)
+        self.processes = processes or os.cpu_count() or 1
+        self.window = window
+        self.max_batch = max_batch
+        self.pending = []  # (job, future) waiting for the next batch
+        self.condition = Condition()
+        self.closed = False
+        self.batches = 0
+        self.jobs = 0
+        Thread(target=self.dispatch, daemon=True).start()
+
+    def submit(self, job: tuple) -> Future:
+        future = Future()
+        with self.condition:
+            self.pending.append((job, future))
+            self.condition.notify()
+        return future
+
+    # waits for a first job, then up to window for more, and hands the batch to the pool without waiting for it,
+    # so the next batch can already be collected while this one runs
+    def dispatch(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+                if self.closed:
+                    return
+                deadline = monotonic() + self.window
+                while len(self.pending) < self.max_batch and (left := deadline - monotonic()) > 0:
+                    self.condition.wait(left)
+                batch, self.pending = self.pending[:self.max_batch], self.pending[self.max_batch:]
+
+            self.batches += 1
+            self.jobs += len(batch)
+            futures = [future for _, future in batch]
+            self.pool.map_async(
+                _run_job, [job for job, _ in batch], chunksize=max(1, len(batch) // self.processes),
+                callback=lambda results, futures=futures: [f.set_result(r) for f, r in zip(futures, results)],
+                error_callback=lambda error, futures=futures: [f.set_exception(error) for f in futures]
+            )
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.pool.terminate()
+
+
+class ServiceStats():
+    def __init__(self):
+        self.lock = Lock()
+        self.started = perf_counter()
+        self.requests = {}
+        self.errors = 0
+        self.completed = 0
+        self.recent = deque(maxlen=LATENCY_SAMPLES)  # (finished at, latency) of the last requests
+
+    def record(self, endpoint: str, latency: float, ok: bool):
+        with self.lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            self.errors += not ok
+            self.completed += 1
+            self.recent.append((perf_counter(), latency))
+
+    def to_dict(self, batcher: Batcher) -> dict:
+        with self.lock:
+            recent = list(self.recent)
+            stats = {'requests': dict(self.requests), 'errors': self.errors, 'completed': self.completed}
+        uptime = perf_counter() - self.started
+        latencies = sorted(latency for _, latency in recent)
+        span = recent[-1][0] - recent[0][0] if len(recent) > 1 else 0.0
+        stats.update({
+            'uptime_s': uptime,
+            'throughput_per_s': stats['completed'] / uptime,
+            'recent_per_s': (len(recent) - 1) / span if span else 0.0,
+            'latency_ms': {
+                'mean': 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+                'p50': 1000 * latencies[len(latencies) // 2] if latencies else 0.0,
+                'p95': 1000 * latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+                'max': 1000 * latencies[-1] if latencies else 0.0,
+            },
+            'batches': batcher.batches,
+            'mean_batch_size': batcher.jobs / batcher.batches if batcher.batches else 0.0,
+            'processes': batcher.processes,
+        })
+        return stats
+
+
+class Handler(BaseHTTPRequestHandler):
+    server: 'SolveServer'
+
+    def do_GET(self):
+        self.respond(dict(parse_qsl(urlsplit(self.path).query)))
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:  # read(-1) would wait for the client to close the connection
+            self.respond(None)
+            return
+        try:
+            params = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            params = None
+        self.respond(params if isinstance(params, dict) else None)
+
+    def respond(self, params: dict | None):
+        time_start = perf_counter()
+        endpoint = urlsplit(self.path).path.strip('/')
+        if params is None:
+            status, body = (400, {'error': 'the body should be a JSON object'})
+        else:
+            status, body = self.route(endpoint, params)
+
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        if endpoint != 'stats':
+            self.server.stats.record(endpoint, perf_counter() - time_start, status == 200)
+
+    # (status, body) for one request
+    def route(self, endpoint: str, params: dict) -> tuple[int, dict]:
+        if endpoint == 'stats':
+            return (200, self.server.stats.to_dict(self.server.batcher))
+        if endpoint == 'generate':
+            try:
+                percent = int(params.get('percent', 35))
+            except (TypeError, ValueError):
+                percent = -1
+            if not 0 <= percent <= 100:
+                return (400, {'error': 'percent should be a number from 0 to 100'})
+            return self.run_job(('generate', None, percent))
+        if endpoint not in ('solve', 'validate', 'count'):
+            return (404, {'error': f'no endpoint \'/{endpoint}\''})
+
+        puzzle = params.get('puzzle')
+        if not isinstance(puzzle, str):
+            return (400, {'error': 'missing puzzle'})
+        if endpoint == 'validate':
+            board = Board()
+            valid = board.import_(puzzle)
+            return (200, {'valid': valid, 'complete': valid and 0 not in board.board})
+        if endpoint == 'count':
+            try:
+                limit = int(params.get('limit', 2))
+            except (TypeError, ValueError):
+                limit = 0
+            if not 1 <= limit <= MAX_COUNT_LIMIT:
+                return (400, {'error': f'limit should be a number from 1 to {MAX_COUNT_LIMIT}'})
+            return self.run_job(('count', puzzle, limit))
+        return self.run_job(('solve', puzzle, None))
+
+    def run_job(self, job: tuple) -> tuple[int, dict]:
+        ok, result = self.server.batcher.submit(job).result()
+        if ok:
+            return (200, result)
+        return (400 if result == 'invalid puzzle' else 500, {'error': result})
+
+    def log_message(self, format: str, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class SolveServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the default 5 resets connections as soon as a burst comes in
+
+    def __init__(
+        self, address: tuple[str, int], processes: int = None, window: float = WINDOW, max_batch: int = MAX_BATCH,
+        verbose: bool = False
+    ):
+        super().__init__(address, Handler)
+        self.batcher = Batcher(processes, window, max_batch)
+        self.stats = ServiceStats()
+        self.verbose = verbose
+
+    def server_close(self):
+        super().server_close()
+        self.batcher.close()
+
+
+# port 0 picks a free one, the address actually used is printed to stderr
+def serve(host: str = '127.0.0.1', port: int = 8081, **kwargs) -> int:
+    server = SolveServer((host, port), **kwargs)
+    print(f'Serving on http://{host}:{server.server_port}', file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
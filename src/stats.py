@@ -0,0 +1,73 @@
+import json
+
+'''
+Per-solve metrics, recorded only when a SolveStats is attached to the board (board.stats = SolveStats()).
+With board.stats = None the solvers skip every hook, the only cost left is a None check per dead end.
+Depth is the number of choices on the stack: filled cells for plain / MRV, branches for dynamic MRV,
+propagation and DLX. Every dead end backtracks, so backtracks[d] counts the dead ends hit at depth d.
+'''
+
+
+class SolveStats():
+    def __init__(self):
+        self.reset('')
+
+    def reset(self, engine: str):
+        self.engine = engine
+        self.solved = False
+        self.iterations = 0
+        self.seconds = 0.0
+        self.max_depth = 0
+        self.dead_ends = 0  # no candidate left for the next cell (the plain loop's empty 'possible')
+        self.backtracks = []  # backtracks[d] is how many dead ends were hit at depth d
+        self.ordering_seconds = 0.0  # picking the next cell: the MRV sort, the propagation solver's min()
+        self.lcv_seconds = 0.0
+        self.propagated = 0
+
+    def dead_end(self, depth: int):
+        self.dead_ends += 1
+        if depth >= len(self.backtracks):
+            self.backtracks.extend([0] * (depth + 1 - len(self.backtracks)))
+        self.backtracks[depth] += 1
+        self.max_depth = max(self.max_depth, depth)
+
+    # the depth of the solution, dead ends alone don't see how deep a search that never backtracked went
+    def reached(self, depth: int):
+        self.max_depth = max(self.max_depth, depth)
+
+    def finish(self, iterations: int | None, seconds: float | None):
+        self.solved = iterations is not None
+        self.iterations = iterations or 0
+        self.seconds = seconds or 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            'engine': self.engine,
+            'solved': self.solved,
+            'iterations': self.iterations,
+            'seconds': self.seconds,
+            'max_depth': self.max_depth,
+            'dead_ends': self.dead_ends,
+            'backtracks_per_depth': self.backtracks,
+            'ordering_seconds': self.ordering_seconds,
+            'lcv_seconds': self.lcv_seconds,
+            'propagated': self.propagated,
+        }
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    # a few short lines for the GUI and solve -v
+    def summary(self) -> str:
+        busiest = max(range(len(self.backtracks)), key=self.backtracks.__getitem__) if self.backtracks else 0
+        lines = [
+            f'{self.engine}: {self.iterations} iteration(s) in {self.seconds:.3f}s',
+            f'max depth {self.max_depth}, {self.dead_ends} dead end(s)',
+            f'most backtracks at depth {busiest}' if self.dead_ends else 'no backtracking',
+        ]
+        if self.ordering_seconds or self.lcv_seconds:
+            lines.append(f'ordering {1000 * self.ordering_seconds:.1f}ms, LCV {1000 * self.lcv_seconds:.1f}ms')
+        if self.propagated:
+            lines.append(f'{self.propagated} cell(s) by propagation')
+        return '\n'.join(lines)
@@ -0,0 +1,102 @@
+import json
+import sqlite3
+from pathlib import Path
+
+'''
+Saved patterns live in an SQLite file, so saving, renaming and deleting one pattern is a single small write.
+Only the names are read at startup, a board is fetched when it's loaded.
+An old database.json is copied over once and then renamed to database.json.migrated.
+Difficulty ratings (see rater.py) are cached in the same row, a pattern's board never changes so they never go stale.
+'''
+
+
+class PatternStore():
+    def __init__(self, path: str = 'database.sqlite', legacy_path: str = 'database.json'):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.execute('CREATE TABLE IF NOT EXISTS patterns (name TEXT PRIMARY KEY, board TEXT NOT NULL)')
+            columns = [row[1] for row in self.connection.execute('PRAGMA table_info(patterns)')]
+            if 'difficulty' not in columns:  # databases from before the ratings
+                self.connection.execute('ALTER TABLE patterns ADD COLUMN difficulty REAL')
+                self.connection.execute('ALTER TABLE patterns ADD COLUMN technique TEXT')
+        if Path(legacy_path).exists():
+            self.migrate(legacy_path)
+
+    def migrate(self, legacy_path: str):
+        with open(legacy_path, 'r') as f:
+            patterns = json.load(f)
+        with self.connection:
+            self.connection.executemany(
+                'INSERT OR IGNORE INTO patterns (name, board) VALUES (?, ?)', patterns.items()
+            )
+        Path(legacy_path).rename(legacy_path + '.migrated')
+
+    def __len__(self) -> int:
+        return self.connection.execute('SELECT COUNT(*) FROM patterns').fetchone()[0]
+
+    def __contains__(self, name: str) -> bool:
+        return self.connection.execute('SELECT 1 FROM patterns WHERE name = ?', (name,)).fetchone() is not None
+
+    def __getitem__(self, name: str) -> str:
+        row = self.connection.execute('SELECT board FROM patterns WHERE name = ?', (name,)).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return row[0]
+
+    def names(self) -> list[str]:
+        return [row[0] for row in self.connection.execute('SELECT name FROM patterns ORDER BY name')]
+
+    # patterns is a list of (name, board), returns how many were added (taken names are skipped)
+    def add_many(self, patterns: list[tuple[str, str]]) -> int:
+        with self.connection:
+            cursor = self.connection.executemany('INSERT OR IGNORE INTO patterns (name, board) VALUES (?, ?)', patterns)
+        return cursor.rowcount
+
+    # (name, board) of every pattern by name, read from the database as it goes
+    def items(self):
+        return self.connection.execute('SELECT name, board FROM patterns ORDER BY name')
+
+    def add(self, name: str, board: str) -> bool:
+        with self.connection:
+            cursor = self.connection.execute(
+                'INSERT OR IGNORE INTO patterns (name, board) VALUES (?, ?)', (name, board)
+            )
+        return cursor.rowcount == 1
+
+    def rename(self, name: str, new_name: str) -> bool:
+        if new_name == name:
+            return False
+        try:
+            with self.connection:
+                cursor = self.connection.execute('UPDATE patterns SET name = ? WHERE name = ?', (new_name, name))
+        except sqlite3.IntegrityError:  # new_name is taken
+            return False
+        return cursor.rowcount == 1
+
+    def delete(self, name: str) -> bool:
+        with self.connection:
+            cursor = self.connection.execute('DELETE FROM patterns WHERE name = ?', (name,))
+        return cursor.rowcount == 1
+
+    # (difficulty, hardest technique) or None if it wasn't rated yet
+    def rating(self, name: str) -> tuple[float, str] | None:
+        row = self.connection.execute('SELECT difficulty, technique FROM patterns WHERE name = ?', (name,)).fetchone()
+        return None if row is None or row[0] is None else row
+
+    # 9 x 9 only, the rater doesn't know bigger boards
+    def unrated(self) -> list[tuple[str, str]]:
+        return self.connection.execute(
+            'SELECT name, board FROM patterns WHERE difficulty IS NULL AND length(board) = 81'
+        ).fetchall()
+
+    # ratings is an iterable of (name, difficulty, technique)
+    def set_ratings(self, ratings):
+        with self.connection:
+            self.connection.executemany(
+                'UPDATE patterns SET difficulty = ?, technique = ? WHERE name = ?',
+                ((difficulty, technique, name) for name, difficulty, technique in ratings)
+            )
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,141 @@
+import numpy as np
+from src.board import Board
+
+'''
+Constraint propagation for many puzzles at once: N boards are an (N, 81) uint16 array of candidate bits
+(bit d - 1 for digit d) and naked/hidden singles run on all of them with whole-array operations.
+Whatever propagation can't finish goes to the scalar DLX solver, starting from the cells propagation already filled.
+Needs numpy, which nothing else in the project does.
+'''
+
+UNITS = np.array(
+    [[r * 9 + i for i in range(9)] for r in range(9)]
+    + [[i * 9 + c for i in range(9)] for c in range(9)]
+    + [[27 * (b // 3) + 3 * (b % 3) + 9 * (i // 3) + i % 3 for i in range(9)] for b in range(9)]
+)
+ROW_OF = np.array([i // 9 for i in range(81)])
+COL_OF = np.array([9 + i % 9 for i in range(81)])
+BOX_OF = np.array([18 + i // 27 * 3 + i % 9 // 3 for i in range(81)])
+BIT_OF = np.array([0x1FF] + [1 << d for d in range(9)], dtype=np.uint16)  # an empty cell can be anything
+POPCOUNT = np.array([bin(i).count('1') for i in range(512)], dtype=np.uint8)
+DIGIT_OF = np.zeros(512, dtype=np.uint8)
+DIGIT_OF[[1 << d for d in range(9)]] = np.arange(1, 10)
+ALL = 0x1FF
+NTH_BIT = np.zeros((512, 9), dtype=np.uint16)  # NTH_BIT[mask, k] is the k-th lowest set bit of mask
+for mask in range(512):
+    bits = [1 << d for d in range(9) if mask & (1 << d)]
+    NTH_BIT[mask, :len(bits)] = bits
+
+
+def to_candidates(puzzles: list[str]) -> np.ndarray:
+    digits = np.frombuffer(''.join(puzzles).encode(), dtype=np.uint8).reshape(-1, 81) - ord('0')
+    return BIT_OF[digits]
+
+
+# for every (board, unit): the bits found in exactly one cell, in any cell and in more than one cell
+def _once_and_repeated(units: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    once = np.zeros(units.shape[:2], dtype=np.uint16)
+    repeated = np.zeros(units.shape[:2], dtype=np.uint16)
+    for c in range(9):
+        repeated |= once & units[:, :, c]
+        once |= units[:, :, c]
+    return (once & ~repeated, once, repeated)
+
+
+# boards whose clues already repeat a digit in some unit
+def conflicting(cand: np.ndarray) -> np.ndarray:
+    single = POPCOUNT[cand] == 1
+    _, _, repeated = _once_and_repeated(np.where(single, cand, 0)[:, UNITS])
+    return (repeated != 0).any(axis=1)
+
+
+# runs singles until nothing changes, returns a bool array of boards that hit a contradiction
+def propagate(cand: np.ndarray) -> np.ndarray:
+    dead = np.zeros(len(cand), dtype=bool)
+    active = np.arange(len(cand))
+
+    while len(active):
+        current = cand[active]
+        single = POPCOUNT[current] == 1
+
+        # naked singles: a solved cell takes its digit away from every unsolved peer
+        solved_units = np.where(single, current, 0)[:, UNITS]
+        _, solved_any, solved_twice = _once_and_repeated(solved_units)
+        eliminate = solved_any[:, ROW_OF] | solved_any[:, COL_OF] | solved_any[:, BOX_OF]
+        new = np.where(single, current, current & ~eliminate)
+
+        # hidden singles: a digit with one spot left in a unit goes there
+        units = new[:, UNITS]
+        exactly_once, anywhere, _ = _once_and_repeated(units)
+        hidden = new & (exactly_once[:, ROW_OF] | exactly_once[:, COL_OF] | exactly_once[:, BOX_OF])
+        new = np.where(hidden != 0, hidden, new)
+
+        broken = (
+            (new == 0).any(axis=1)
+            | (POPCOUNT[hidden] > 1).any(axis=1)
+            | (solved_twice != 0).any(axis=1)
+            | (anywhere != ALL).any(axis=1)
+        )
+        dead[active[broken]] = True
+        changed = (new != current).any(axis=1) & ~broken
+        cand[active] = new
+        active = active[changed]
+
+    return dead
+
+
+# splits every board on its cell with the fewest candidates, one child per candidate
+def branch(cand: np.ndarray, owner: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    counts = POPCOUNT[cand].astype(np.int16)
+    cells = np.where(counts > 1, counts, 10).argmin(axis=1)
+    masks = cand[np.arange(len(cand)), cells]
+    splits = POPCOUNT[masks].astype(np.int64)
+
+    parents = np.repeat(np.arange(len(cand)), splits)
+    nth = np.arange(len(parents)) - np.repeat(np.cumsum(splits) - splits, splits)
+    children = cand[parents]
+    children[np.arange(len(parents)), cells[parents]] = NTH_BIT[masks[parents], nth]
+    return (children, owner[parents])
+
+
+# returns (one solution string or None per puzzle, how many needed the scalar solver), puzzles are 81 digits each
+# boards still open after propagation are branched on and propagated again up to depth times,
+# only what's left after that (or once there would be more than max_rows boards) goes to the scalar DLX solver
+def solve_many(
+    puzzles: list[str], board: Board = None, depth: int = 16, max_rows: int = None
+) -> tuple[list[str | None], int]:
+    max_rows = max_rows or 8 * len(puzzles)
+    solutions = [None] * len(puzzles)
+    if not puzzles:
+        return (solutions, 0)
+
+    cand = to_candidates(puzzles)
+    owner = np.arange(len(puzzles))
+    solved = np.zeros(len(puzzles), dtype=bool)
+    for level in range(depth + 1):
+        dead = propagate(cand)
+        done = (POPCOUNT[cand] == 1).all(axis=1) & ~dead & ~solved[owner]
+        owners, first = np.unique(owner[done], return_index=True)  # the first solution found for a puzzle wins
+        text = (DIGIT_OF[cand[done][first]] + ord('0')).tobytes().decode()
+        for k, i in enumerate(owners.tolist()):
+            solutions[i] = text[81 * k:81 * k + 81]
+        solved[owners] = True
+
+        open_rows = ~dead & ~done & ~solved[owner]
+        cand, owner = cand[open_rows], owner[open_rows]
+        if level == 0:  # what propagation alone got done, the scalar fallback starts from here
+            text = (np.where(POPCOUNT[cand] == 1, DIGIT_OF[cand], 0).astype(np.uint8) + ord('0')).tobytes().decode()
+            starts = {i: text[81 * k:81 * k + 81] for k, i in enumerate(owner.tolist())}
+        if not len(cand) or level == depth or len(cand) > max_rows:
+            break
+        cand, owner = branch(cand, owner)
+
+    board = board or Board()
+    board.set_engine('dlx')
+    fallbacks = 0
+    for i in np.unique(owner).tolist():  # the really hard ones
+        if not solved[i]:
+            fallbacks += 1
+            if board.import_(starts[i]) and board.solve()[0] is not None:
+                solutions[i] = board.export()
+    return (solutions, fallbacks)
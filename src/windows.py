@@ -1,4 +1,7 @@
-from src import tk
+from pathlib import Path
+from threading import Thread
+from tkinter import filedialog
+from src import tk, PatternStore
 
 
 class Window(tk.Tk):
@@ -15,6 +18,7 @@ class Window(tk.Tk):
         self._pt_listbox = gui.pattern_frame
         self.selected_pattern = gui.action_frame.selected_pattern
         self.state_on_enter = gui.state
+        self.busy = False  # a file import/export is running, its poll needs this window alive to finish
 
         self.bg = gui['bg']
         self['bg'] = gui['bg']
@@ -24,6 +28,8 @@ class Window(tk.Tk):
         self._pt_listbox.unfocus()
 
     def on_close(self):
+        if self.busy:
+            return
         self.destroy()
         self._gui.set_states_on_event(self.state_on_enter)
         self._gui.opened_window = None
@@ -73,16 +79,68 @@ class SaveWindow(EntryWindow):
 class ImportWindow(EntryWindow):
     def __init__(self, gui: tk.Tk):
         super().__init__(gui, 'Import a sudoku pattern', entry_width=83)
+        self.import_stats = None
+        self.import_error = None
+
+        self.bt_file = tk.Button(self, text='Import a file into the library...', command=self.import_file)
+        self.bt_file.grid(row=3, columnspan=3)
 
     def confirm(self, event=None):
         prompt = self.entry.get()
+        snapshot = self._board.snapshot()
         if self._board.import_(prompt):
-            self._gui.set_info_text('pattern_import')
+            self._gui.history.push(snapshot)
+            self._gui.set_info_text('pattern_import', self._gui.action_frame.solution_status())
             self._board_frame.update_all()
             self.on_close()
         elif prompt:
             self.info_label['text'] = 'Invalid input!'
 
+    # the import runs on its own thread (and its own database connection), rejected lines go to <file>.errors
+    def import_file(self):
+        path = filedialog.askopenfilename(parent=self, filetypes=[('Puzzles', '*.txt *.sdm'), ('All files', '*')])
+        if not path:
+            return
+        self.bt_file['state'] = self.bt_confirm['state'] = self.bt_cancel['state'] = 'disabled'
+        self.info_label['text'] = f'Importing {Path(path).name}...'
+        self.import_stats = self.import_error = None
+        self.busy = True
+        Thread(target=self.run_import, args=(path,), daemon=True).start()
+        self.after(200, self.poll_import, path)
+
+    # an unreadable file (not text, no permission...) ends up in import_error so poll_import can stop
+    def run_import(self, path: str):
+        from src import bulk
+
+        try:
+            store = PatternStore(self._pt_listbox.patterns.path)
+            try:
+                with open(path + '.errors', 'w') as errors:
+                    self.import_stats = bulk.import_file(store, path, errors=errors)
+            finally:
+                store.close()
+        except Exception as e:
+            self.import_error = e
+
+    def poll_import(self, path: str):
+        if self.import_stats is None and self.import_error is None:
+            self.after(200, self.poll_import, path)
+            return
+        from src import bulk
+
+        self.busy = False
+        if self.import_error is not None:
+            self._pt_listbox.reload()  # whatever was committed before the error is in the library
+            self.info_label['text'] = f'Import failed: {type(self.import_error).__name__}'
+            self.bt_file['state'] = self.bt_confirm['state'] = self.bt_cancel['state'] = 'normal'
+            return
+
+        if not self.import_stats['failed']:
+            Path(path + '.errors').unlink()
+        self._pt_listbox.reload()
+        self._gui.set_info_text('pattern_bulk', bulk.report(self.import_stats))
+        self.on_close()
+
 
 class ExportWindow(Window):
     def __init__(self, gui: tk.Tk):
@@ -96,6 +154,49 @@ class ExportWindow(Window):
         self.export_str.grid(row=1)
         self.export_str.insert(0, self._board.export())
 
+        self.bt_file = tk.Button(self, text='Export the library to a file...', command=self.export_file)
+        self.bt_file.grid(row=2, pady=(10, 0))
+        self.export_result = None  # pattern count, or the exception that stopped the export
+
+    # like the import, the export runs on its own thread (and its own database connection)
+    def export_file(self):
+        path = filedialog.asksaveasfilename(
+            parent=self, defaultextension='.txt', filetypes=[('One puzzle per line', '*.txt'), ('SudoCue', '*.sdm')]
+        )
+        if not path:
+            return
+        self.bt_file['state'] = 'disabled'
+        self.title_label['text'] = f'Exporting to {Path(path).name}...'
+        self.export_result = None
+        self.busy = True
+        Thread(target=self.run_export, args=(path,), daemon=True).start()
+        self.after(200, self.poll_export, path)
+
+    def run_export(self, path: str):
+        from src import bulk
+
+        try:
+            store = PatternStore(self._pt_listbox.patterns.path)
+            try:
+                self.export_result = bulk.export_file(store, path)
+            finally:
+                store.close()
+        except Exception as e:
+            self.export_result = e
+
+    def poll_export(self, path: str):
+        if self.export_result is None:
+            self.after(200, self.poll_export, path)
+            return
+
+        self.busy = False
+        if isinstance(self.export_result, Exception):
+            self.title_label['text'] = f'Export failed: {type(self.export_result).__name__}'
+            self.bt_file['state'] = 'normal'
+            return
+        self._gui.set_info_text('pattern_bulk', f'Exported {self.export_result} pattern(s) to {Path(path).name}.')
+        self.on_close()
+
 
 class RenameWindow(EntryWindow):
     def __init__(self, gui: tk.Tk):
@@ -143,9 +244,7 @@ class RandomWindow(EntryWindow):
     def confirm(self, event=None):
         prompt = self.entry.get()
         if prompt.isdigit() and 0 <= int(prompt) <= 100:
-            self._gui.set_info_text('pattern_random')
-            self._board.generate_random(int(prompt))
-            self._board_frame.update_all()
             self.on_close()
+            self._gui.action_frame.start_random(int(prompt))
         elif prompt:
             self.info_label['text'] = 'Invalid input!'
@@ -0,0 +1,101 @@
+import json
+import unittest
+from threading import Thread
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+from src.server import MAX_COUNT_LIMIT, SolveServer
+
+'''
+The solving service end to end on localhost: a real SolveServer on a free port with a one-process pool.
+python -m unittest discover tests (or python -m pytest tests) from the repository root.
+'''
+
+PUZZLE = '530070000600195000098000060800060003400803001700020006060000280000419005000080079'
+SOLUTION = '534678912672195348198342567859761423426853791713924856961537284287419635345286179'
+
+
+class ServerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = SolveServer(('127.0.0.1', 0), processes=1)
+        cls.url = f'http://127.0.0.1:{cls.server.server_port}'
+        cls.thread = Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.thread.join()
+
+    # (status, body) of one request, a POST with body as JSON when it's given
+    def call(self, path: str, body=None) -> tuple[int, dict]:
+        data = body if isinstance(body, bytes) or body is None else json.dumps(body).encode()
+        try:
+            with urlopen(Request(self.url + path, data=data), timeout=30) as response:
+                return (response.status, json.load(response))
+        except HTTPError as e:
+            return (e.code, json.load(e))
+
+    def test_solve(self):
+        status, body = self.call('/solve', {'puzzle': PUZZLE})
+        self.assertEqual(status, 200)
+        self.assertEqual(body['solution'], SOLUTION)
+        self.assertGreater(body['iterations'], 0)
+
+    def test_solve_query_string(self):
+        status, body = self.call(f'/solve?puzzle={PUZZLE}')
+        self.assertEqual((status, body['solution']), (200, SOLUTION))
+
+    def test_solve_no_solution(self):  # nothing clashes but r1c9 can only be 9, which column 9 already has
+        puzzle = '123456780' + 18 * '0' + '000000009' + 45 * '0'
+        self.assertEqual(self.call('/validate', {'puzzle': puzzle})[1]['valid'], True)
+        self.assertEqual(self.call('/solve', {'puzzle': puzzle}), (200, {'solution': None}))
+
+    def test_validate(self):
+        self.assertEqual(self.call('/validate', {'puzzle': PUZZLE}), (200, {'valid': True, 'complete': False}))
+        self.assertEqual(self.call('/validate', {'puzzle': SOLUTION}), (200, {'valid': True, 'complete': True}))
+        self.assertEqual(self.call('/validate', {'puzzle': 'x' * 81})[1]['valid'], False)
+
+    def test_count(self):
+        self.assertEqual(self.call('/count', {'puzzle': PUZZLE}), (200, {'count': 1}))
+        self.assertEqual(self.call('/count', {'puzzle': '0' * 81, 'limit': 5}), (200, {'count': 5}))
+        self.assertEqual(self.call('/count', {'puzzle': '0' * 81, 'limit': MAX_COUNT_LIMIT})[1]['count'], 1000)
+
+    def test_count_limit(self):
+        for limit in (0, -1, MAX_COUNT_LIMIT + 1, 'many', None):
+            status, body = self.call('/count', {'puzzle': PUZZLE, 'limit': limit})
+            self.assertEqual(status, 400, limit)
+            self.assertIn('limit', body['error'])
+
+    def test_generate(self):
+        status, body = self.call('/generate', {'percent': 40})
+        self.assertEqual(status, 200)
+        self.assertEqual(self.call('/validate', {'puzzle': body['puzzle']})[1]['valid'], True)
+        self.assertEqual(self.call('/count', {'puzzle': body['puzzle']})[1]['count'], 1)
+        self.assertEqual(self.call('/generate', {'percent': 101})[0], 400)
+
+    def test_stats(self):
+        self.call('/validate', {'puzzle': PUZZLE})
+        status, body = self.call('/stats')
+        self.assertEqual(status, 200)
+        self.assertGreaterEqual(body['requests']['validate'], 1)
+        self.assertEqual(body['processes'], 1)
+        self.assertIn('p95', body['latency_ms'])
+
+    def test_bad_requests(self):
+        self.assertEqual(self.call('/solve', {})[0], 400)
+        self.assertEqual(self.call('/solve', {'puzzle': 'nope'}), (400, {'error': 'invalid puzzle'}))
+        self.assertEqual(self.call('/solve', b'not json')[0], 400)
+        self.assertEqual(self.call('/solve', [PUZZLE])[0], 400)
+        self.assertEqual(self.call('/nothing', {'puzzle': PUZZLE})[0], 404)
+
+    def test_bad_content_length(self):
+        request = Request(self.url + '/solve', data=b'{}', headers={'Content-Length': 'abc'})
+        with self.assertRaises(HTTPError) as caught:
+            urlopen(request, timeout=30)
+        self.assertEqual(caught.exception.code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()